@@ -0,0 +1,97 @@
+"""LLM callback handlers: request/usage logging for the main Agent."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+import orjson
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import LLMResult
+
+logger = logging.getLogger(__name__)
+
+# 提示词日志仅保留首尾各 N 个字符，避免整段数十 KB 的 prompt 进入日志处理器
+PROMPT_PREVIEW_CHARS = 200
+
+
+class _LazyJson:
+    """延迟序列化：仅当日志记录真正输出时才执行 orjson.dumps."""
+
+    __slots__ = ("obj",)
+
+    def __init__(self, obj: Any) -> None:
+        self.obj = obj
+
+    def __str__(self) -> str:
+        return orjson.dumps(
+            self.obj, default=str, option=orjson.OPT_NON_STR_KEYS
+        ).decode()
+
+
+def _preview(text: str, limit: int = PROMPT_PREVIEW_CHARS) -> str:
+    """截取文本首尾各 limit 个字符."""
+    if len(text) <= limit * 2:
+        return text
+    return f"{text[:limit]} ...({len(text)} chars)... {text[-limit:]}"
+
+
+class LLMRequestLogger(BaseCallbackHandler):
+    """记录每次 LLM 请求的概要与 token 用量，重点关注 prompt cache 命中情况.
+
+    请求日志为 DEBUG 级别，仅记录消息数、字符数和末条消息首尾预览，
+    invocation_params 延迟序列化，未启用 DEBUG 时不产生任何开销。
+
+    OpenAI 兼容接口会在 usage 中返回 cached_tokens，langchain_openai 将其
+    映射为 usage_metadata["input_token_details"]["cache_read" / "cache_creation"]。
+    """
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list[list[BaseMessage]],
+        **kwargs: Any,
+    ) -> None:
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+
+        for batch in messages:
+            total_chars = sum(
+                len(m.content) if isinstance(m.content, str) else 0 for m in batch
+            )
+            last = batch[-1] if batch else None
+            last_text = last.content if last and isinstance(last.content, str) else ""
+            logger.debug(
+                "LLM request: messages=%d chars=%d last=%s params=%s",
+                len(batch),
+                total_chars,
+                _preview(last_text),
+                _LazyJson(kwargs.get("invocation_params", {})),
+            )
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        usage = self._extract_usage(response)
+        if not usage:
+            return
+
+        details = usage.get("input_token_details") or {}
+        logger.info(
+            "LLM usage: input=%s output=%s cache_read_input_tokens=%s "
+            "cache_creation_input_tokens=%s",
+            usage.get("input_tokens", 0),
+            usage.get("output_tokens", 0),
+            details.get("cache_read", 0),
+            details.get("cache_creation", 0),
+        )
+
+    @staticmethod
+    def _extract_usage(response: LLMResult) -> dict[str, Any] | None:
+        """从 LLMResult 中取出第一条消息的 usage_metadata."""
+        for generations in response.generations:
+            for gen in generations:
+                message = getattr(gen, "message", None)
+                usage = getattr(message, "usage_metadata", None)
+                if usage:
+                    return usage
+        return None
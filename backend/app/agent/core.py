@@ -2,24 +2,19 @@
 
 from __future__ import annotations
 
+import hashlib
 import logging
+from typing import TYPE_CHECKING
 
-from langchain.agents.middleware import ContextEditingMiddleware, ClearToolUsesEdit
-from langchain_openai import ChatOpenAI
-from langchain.agents import create_agent
-from langgraph.checkpoint.memory import InMemorySaver
-
-from app.agent.middleware.data_table import DataTableMiddleware
-from app.agent.middleware.missing_params import MissingParamsMiddleware
-from app.agent.middleware.suggestions import SuggestionsMiddleware
-from app.agent.subagents import SubAgentMiddleware
-from app.agent.subagents.agents.todo_tracker import TODO_TRACKER_CONFIG
-from app.agent.tools.telecom_tools import register_telecom_tools
-from app.agent.tools.hil import CustomHumanInTheLoopMiddleware
-from app.agent.tools.knowledge import register_knowledge_tools
-from app.agent.tools.registry import tool_registry
 from app.config import settings
 
+if TYPE_CHECKING:
+    from langchain.agents.middleware import AgentMiddleware
+    from langchain_core.tools import BaseTool
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    from app.agent.middleware.missing_params import ParamSchema
+
 logger = logging.getLogger(__name__)
 
 SYSTEM_PROMPT = """\
@@ -110,66 +105,115 @@ SYSTEM_PROMPT = """\
 - 在根因分析后，提供"是，进行优化仿真"和"否，暂不优化"选项
 """
 
-# In-memory checkpointer for dev/validation stage
-_checkpointer = InMemorySaver()
-
-# Track whether tools have been registered
-_initialized = False
+# 以系统提示词内容作为 prompt_cache_key，保证同一提示词的请求被路由到同一缓存前缀
+_PROMPT_CACHE_KEY = hashlib.sha1(SYSTEM_PROMPT.encode("utf-8")).hexdigest()
+
+# In-memory checkpointer for dev/validation stage (created on first use)
+_checkpointer: InMemorySaver | None = None
+
+# Registry snapshot (tools, hitl_config, param_edit_config), populated once
+_registry_snapshot: (
+    tuple[tuple[BaseTool, ...], dict[str, bool], dict[str, dict[str, ParamSchema]]]
+    | None
+) = None
+
+
+def _ensure_initialized() -> tuple[
+    tuple[BaseTool, ...], dict[str, bool], dict[str, dict[str, ParamSchema]]
+]:
+    """Register tools on first call and cache the registry snapshot."""
+    global _registry_snapshot
+    if _registry_snapshot is None:
+        from app.agent.tools.knowledge import register_knowledge_tools
+        from app.agent.tools.registry import tool_registry
+        from app.agent.tools.telecom_tools import register_telecom_tools
+
+        register_telecom_tools()
+        register_knowledge_tools()
+        _registry_snapshot = (
+            tool_registry.get_all_tools(),
+            tool_registry.get_hitl_config(),
+            tool_registry.get_param_edit_config(),
+        )
+    return _registry_snapshot
+
+
+# 上下文裁剪时保留结果的工具（领域知识检索结果需贯穿整个分析流程）
+CONTEXT_EDIT_EXCLUDED_TOOLS: frozenset[str] = frozenset(
+    {"search_design_doc", "search_terminology"}
+)
+
+# Stateless middleware shared by every build_agent() call (created on first use)
+_static_middleware: tuple[AgentMiddleware, ...] | None = None
+
+
+def _get_static_middleware() -> tuple[AgentMiddleware, ...]:
+    """Return the frozen (DataTable, Suggestions, ContextEditing) middleware tuple."""
+    global _static_middleware
+    if _static_middleware is None:
+        from langchain.agents.middleware import ClearToolUsesEdit, ContextEditingMiddleware
+
+        from app.agent.middleware.data_table import DataTableMiddleware
+        from app.agent.middleware.suggestions import SuggestionsMiddleware
+        from app.agent.tools.registry import tool_registry
+
+        _ensure_initialized()
+        _static_middleware = (
+            DataTableMiddleware(tool_names=tool_registry.get_data_table_tools()),
+            SuggestionsMiddleware(),
+            ContextEditingMiddleware(
+                edits=[
+                    ClearToolUsesEdit(
+                        trigger=3000,
+                        keep=2,
+                        clear_tool_inputs=True,
+                        exclude_tools=CONTEXT_EDIT_EXCLUDED_TOOLS,
+                        placeholder="[cleared]",
+                    ),
+                ]
+            ),
+        )
+    return _static_middleware
 
 
-def _ensure_initialized() -> None:
-    global _initialized
-    if _initialized:
-        return
-    register_telecom_tools()
-    register_knowledge_tools()
-    _initialized = True
+def build_agent():
+    """Build and return the main Agent (CompiledStateGraph).
 
+    langchain / langgraph and the middleware stack are imported here rather
+    than at module top, so importing this module (e.g. on app startup or a
+    /health hit) does not pay their import cost until the agent is needed.
+    """
+    from langchain.agents import create_agent
+    from langchain_openai import ChatOpenAI
 
-def build_agent():
-    """Build and return the main Agent (CompiledStateGraph)."""
-    _ensure_initialized()
+    from app.agent.callbacks import LLMRequestLogger
+    from app.agent.llm_cache import ReplaySafeInMemoryCache
+    from app.agent.middleware.missing_params import MissingParamsMiddleware
+    from app.agent.subagents import SubAgentMiddleware
+    from app.agent.subagents.agents.todo_tracker import TODO_TRACKER_CONFIG
+    from app.agent.tools.hil import CustomHumanInTheLoopMiddleware
 
-    all_tools = tool_registry.get_all_tools()
-    hitl_config = tool_registry.get_hitl_config()
-    param_edit_config = tool_registry.get_param_edit_config()
+    registry_tools, hitl_config, param_edit_config = _ensure_initialized()
 
     # SubAgent Middleware（替代 TodoListMiddleware）
     subagent_mw = SubAgentMiddleware(
         delegated=[],
         reactive=[TODO_TRACKER_CONFIG],
+        max_batch_concurrency=settings.subagent_max_concurrency,
     )
-    # 注入 task() tool（如有委派式子 Agent）
-    all_tools.extend(subagent_mw.tools)
-
-    middleware = [
-        subagent_mw,
-        DataTableMiddleware(),
-        SuggestionsMiddleware(),
-        ContextEditingMiddleware(
-            edits=[
-                ClearToolUsesEdit(
-                    trigger= 3000,
-                    keep=2,
-                    clear_tool_inputs= True,
-                    exclude_tools=[
-                        'search_design_doc',
-                        'search_terminology',
-                    ],
-                    placeholder="[cleared]"
-                ),
-            ]
-        )
-    ]
+    # 注入 task() / batch_task() tool（如有委派式子 Agent），一次性组装最终工具元组
+    all_tools = (*registry_tools, *subagent_mw.tools)
+
+    middleware = [subagent_mw, *_get_static_middleware()]
 
     # Add MissingParams middleware when there are tools with param edit schema
     if param_edit_config:
-        middleware.append(
-            MissingParamsMiddleware(
-                tools_with_param_edit=param_edit_config,
-                description_prefix="请填写以下参数",
-            )
+        missing_params_mw = MissingParamsMiddleware(
+            tools_with_param_edit=param_edit_config,
+            description_prefix="请填写以下参数",
         )
+        missing_params_mw.bind_tools(all_tools)
+        middleware.append(missing_params_mw)
 
     # Only add HITL middleware when there are tools requiring it
     if hitl_config:
@@ -185,7 +229,23 @@ def build_agent():
         model=settings.llm_model,  # 例如 "qwen-max"
         api_key=settings.llm_api_key,
         base_url=settings.llm_base_url,
-        streaming=True
+        streaming=True,
+        # 流式输出时同样返回 usage，便于观测 prompt cache 命中率
+        stream_usage=True,
+        extra_body=(
+            {"prompt_cache_key": _PROMPT_CACHE_KEY}
+            if settings.llm_prompt_cache
+            else None
+        ),
+        callbacks=[LLMRequestLogger()],
+        # 精确匹配缓存（默认关闭）：key 为完整消息列表 + 绑定的工具 schema + 模型参数，
+        # 跨会话重复的相同提问直接命中；工具结果变化时 key 随之变化，不会返回过期数据。
+        # 命中时重新生成消息 / tool_call id，避免不同会话共享同一 id
+        cache=(
+            ReplaySafeInMemoryCache(maxsize=settings.llm_response_cache_size)
+            if settings.llm_response_cache_size > 0
+            else None
+        ),
     )
 
     agent = create_agent(
@@ -193,7 +253,7 @@ def build_agent():
         tools=all_tools,
         system_prompt=SYSTEM_PROMPT,
         middleware=middleware,
-        checkpointer=_checkpointer,
+        checkpointer=get_checkpointer(),
     )
     return agent
 
@@ -210,4 +270,9 @@ def get_agent():
 
 
 def get_checkpointer() -> InMemorySaver:
+    global _checkpointer
+    if _checkpointer is None:
+        from langgraph.checkpoint.memory import InMemorySaver
+
+        _checkpointer = InMemorySaver()
     return _checkpointer
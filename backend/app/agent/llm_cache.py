@@ -0,0 +1,48 @@
+"""Exact-match LLM response cache for the main Agent."""
+
+from __future__ import annotations
+
+import uuid
+from typing import Any
+
+from langchain_core.caches import RETURN_VAL_TYPE, InMemoryCache
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+
+
+def _fresh_generation(generation: Any) -> Any:
+    """Copy a cached generation with new message / tool_call ids.
+
+    The cache is process-wide, so a hit may replay a message first produced in
+    another conversation. Reusing its ids would make that message (and the
+    tool calls it requests) look identical across threads; clearing the message
+    id lets the messages reducer assign a new one, and tool_call ids are
+    regenerated so the ToolMessages answering them are unique too.
+    """
+    if not isinstance(generation, ChatGeneration):
+        return generation
+    message = generation.message
+    update: dict[str, Any] = {"id": None}
+    if isinstance(message, AIMessage) and message.tool_calls:
+        update["tool_calls"] = [
+            {**tc, "id": f"call_{uuid.uuid4().hex[:24]}"} for tc in message.tool_calls
+        ]
+        # Raw provider payload still carries the old ids; tool_calls is authoritative
+        if "tool_calls" in message.additional_kwargs:
+            update["additional_kwargs"] = {
+                k: v for k, v in message.additional_kwargs.items() if k != "tool_calls"
+            }
+    return ChatGeneration(
+        message=message.model_copy(update=update),
+        generation_info=generation.generation_info,
+    )
+
+
+class ReplaySafeInMemoryCache(InMemoryCache):
+    """InMemoryCache whose hits never reuse message or tool_call ids."""
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        cached = super().lookup(prompt, llm_string)
+        if cached is None:
+            return None
+        return [_fresh_generation(g) for g in cached]
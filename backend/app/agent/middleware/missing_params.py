@@ -6,22 +6,100 @@
 
 from __future__ import annotations
 
-import json
+import functools
 import logging
 import re
 import uuid
+from collections.abc import Callable, Sequence
 from typing import Any
 
+import orjson
 from langchain.agents import AgentState
 from langchain.agents.middleware import AgentMiddleware
-from langchain_core.messages import AIMessage
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import BaseTool
 from langgraph.runtime import Runtime
 from langgraph.types import interrupt
 from langgraph.typing import ContextT
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+from typing_extensions import NotRequired
 
 logger = logging.getLogger(__name__)
 
+# 用户在 before_tool 表单中取消时返回给 LLM 的工具结果
+_CANCEL_CONTENT = "用户取消了参数编辑，操作已终止。"
+
+# LLM 在回复中输出的参数请求块: ```params_request {...} ```
+_PARAMS_REQUEST_RE = re.compile(r"```params_request\s*(\{[\s\S]*?\})\s*```", re.IGNORECASE)
+
+# 按值的具体类型分派空值判定；未列出的类型（数值、布尔等）一律视为非空。
+# 字符串用 isspace() 判定纯空白：与 not v.strip() 等价，但不创建新字符串，
+# 且遇到第一个非空白字符即返回
+_EMPTY_CHECKS: dict[type, Callable[[Any], bool]] = {
+    type(None): lambda v: True,
+    str: lambda v: not v or v.isspace(),
+    list: lambda v: not v,
+    dict: lambda v: not v,
+}
+
+
+# 正则元字符；"^" 之后不含这些字符的 pattern 是字面前缀
+_REGEX_METACHARS = frozenset(".^$*+?{}[]\\|()")
+
+# 纯长度约束 pattern: ^.{m}$、^.{m,}$、^.{m,n}$
+_LENGTH_PATTERN_RE = re.compile(r"\^\.\{(\d+)(,(\d*))?\}\$")
+
+
+def _length_bounds(pattern: str) -> tuple[int, int | None] | None:
+    """解析纯长度约束 pattern，返回 (最小长度, 最大长度或 None)；不是则返回 None."""
+    match = _LENGTH_PATTERN_RE.fullmatch(pattern)
+    if match is None:
+        return None
+    low = int(match.group(1))
+    if match.group(2) is None:
+        return low, low
+    high = int(match.group(3)) if match.group(3) else None
+    if high is not None and high < low:
+        return None  # 非法区间交给 re.compile 报错
+    return low, high
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_pattern(pattern: str) -> Callable[[str], bool]:
+    """将 JSON Schema pattern 编译为判定函数，按 pattern 缓存.
+
+    JSON Schema 的 pattern 为搜索语义（非整串匹配）。平凡 pattern 不进入正则引擎，
+    判定结果与 re.search 一致（"." 不匹配换行）：
+    - ""、".*"、"^.*"：恒为真
+    - ".+"：含换行以外的字符
+    - "^.{m,n}$" 及 {m}、{m,} 变体：不含换行（末尾单个换行除外）且长度在范围内
+    - "^前缀"（前缀不含正则元字符）：str.startswith
+    """
+    if pattern in ("", ".*", "^.*"):
+        return lambda value: True
+    if pattern == ".+":
+        return lambda value: bool(value.strip("\n"))
+    bounds = _length_bounds(pattern)
+    if bounds is not None:
+        low, high = bounds
+
+        def check_length(value: str) -> bool:
+            # "$" 也匹配末尾换行之前的位置，该换行不计入长度
+            body = value[:-1] if value.endswith("\n") else value
+            return (
+                "\n" not in body
+                and low <= len(body)
+                and (high is None or len(body) <= high)
+            )
+
+        return check_length
+    if pattern.startswith("^"):
+        prefix = pattern[1:]
+        if prefix and _REGEX_METACHARS.isdisjoint(prefix):
+            return lambda value: value.startswith(prefix)
+    regex = re.compile(pattern)
+    return lambda value: regex.search(value) is not None
+
 
 # ---------------------------------------------------------------------------
 # Param Schema 模型 - 参照 Airflow Params + JSON Schema
@@ -33,61 +111,50 @@ class ParamSchema(BaseModel):
 
     参考 Airflow 的 Params 设计:
     https://airflow.apache.org/docs/apache-airflow/stable/core-concepts/params.html
+
+    实例不可变，字段相同的 schema 可在多个工具间共享同一对象。
     """
 
-    # 基础信息
-    type: str | list[str] = Field(
-        default="string",
-        description="参数类型: string, number, integer, boolean, array, object, null 或组合",
-    )
-    title: str | None = Field(default=None, description="表单字段标签")
-    description: str | None = Field(default=None, description="帮助文本/提示")
+    model_config = ConfigDict(frozen=True)
+
+    # 基础信息（type: string, number, integer, boolean, array, object, null 或组合）
+    type: str | list[str] = "string"
+    title: str | None = None  # 表单字段标签
+    description: str | None = None  # 帮助文本/提示
 
     # 默认值
-    default: Any = Field(default=None, description="默认值")
+    default: Any = None
 
     # 约束 - 字符串
-    minLength: int | None = Field(default=None, description="字符串最小长度")
-    maxLength: int | None = Field(default=None, description="字符串最大长度")
-    pattern: str | None = Field(default=None, description="正则表达式验证")
-    format: str | None = Field(
-        default=None,
-        description="特殊格式: date, date-time, time, email, uri, multiline",
-    )
+    minLength: int | None = None
+    maxLength: int | None = None
+    pattern: str | None = None  # 正则表达式（JSON Schema 搜索语义）
+    format: str | None = None  # date, date-time, time, email, uri, multiline
 
     # 约束 - 数值
-    minimum: float | None = Field(default=None, description="数值最小值")
-    maximum: float | None = Field(default=None, description="数值最大值")
-    exclusiveMinimum: float | None = Field(default=None, description="数值排他最小值")
-    exclusiveMaximum: float | None = Field(default=None, description="数值排他最大值")
-    multipleOf: float | None = Field(default=None, description="数值步进")
+    minimum: float | None = None
+    maximum: float | None = None
+    exclusiveMinimum: float | None = None
+    exclusiveMaximum: float | None = None
+    multipleOf: float | None = None  # 数值步进
 
     # 约束 - 枚举/选项
-    enum: list[Any] | None = Field(default=None, description="可选值列表（下拉选择）")
-    examples: list[Any] | None = Field(
-        default=None,
-        description="建议值列表（可输入也可选择）",
-    )
-    values_display: dict[str, str] | None = Field(
-        default=None,
-        description="enum/examples 的显示标签映射",
-    )
+    enum: list[Any] | None = None  # 可选值列表（下拉选择）
+    examples: list[Any] | None = None  # 建议值列表（可输入也可选择）
+    values_display: dict[str, str] | None = None  # enum/examples 的显示标签映射
 
     # 约束 - 数组
-    items: dict[str, Any] | None = Field(
-        default=None,
-        description="数组元素的 schema 定义",
-    )
-    minItems: int | None = Field(default=None, description="数组最小长度")
-    maxItems: int | None = Field(default=None, description="数组最大长度")
-    uniqueItems: bool | None = Field(default=None, description="数组元素是否唯一")
+    items: dict[str, Any] | None = None  # 数组元素的 schema 定义
+    minItems: int | None = None
+    maxItems: int | None = None
+    uniqueItems: bool | None = None
 
     # UI 相关
-    section: str | None = Field(default=None, description="表单分组名称")
-    const: Any | None = Field(default=None, description="隐藏字段的固定值")
+    section: str | None = None  # 表单分组名称
+    const: Any | None = None  # 隐藏字段的固定值
 
     # 扩展元数据
-    placeholder: str | None = Field(default=None, description="输入框占位提示")
+    placeholder: str | None = None  # 输入框占位提示
 
     def is_required(self) -> bool:
         """判断参数是否必填.
@@ -99,9 +166,19 @@ class ParamSchema(BaseModel):
             return "null" not in self.type
         return self.type != "null"
 
+    def matches(self, value: str) -> bool:
+        """按 pattern 校验字符串值，未设置 pattern 时恒为 True."""
+        if self.pattern is None:
+            return True
+        return _compile_pattern(self.pattern)(value)
+
 
 class MissingParamsInfo(BaseModel):
-    """缺省参数信息，用于 interrupt 传递给前端."""
+    """缺省参数信息，用于 interrupt 传递给前端.
+
+    定义 params_edit interrupt 中 info 字段的结构；middleware 运行时直接构造
+    同结构的 dict，需要校验的边界可用 MissingParamsInfo.model_validate(info)。
+    """
 
     tool_name: str = Field(description="工具名称")
     tool_call_id: str = Field(description="工具调用 ID")
@@ -121,9 +198,13 @@ class MissingParamsInfo(BaseModel):
 
 
 class MissingParamsState(AgentState):
-    """扩展的 Agent State，包含 missing_params 字段."""
+    """扩展的 Agent State，包含 missing_params 字段.
 
-    missing_params_pending: MissingParamsInfo | None
+    AgentState 是 TypedDict，state 本身即普通 dict，无实例属性开销；
+    该 key 仅在需要时出现，声明为 NotRequired。
+    """
+
+    missing_params_pending: NotRequired[MissingParamsInfo | None]
 
 
 # ---------------------------------------------------------------------------
@@ -167,6 +248,27 @@ class MissingParamsMiddleware(AgentMiddleware[MissingParamsState, ContextT]):
         self._tools_schema = tools_with_param_edit or {}
         self._check_all = check_all_tools
         self._description_prefix = description_prefix
+        # 工具名 -> interrupt 描述文本；check_all 推断出的工具首次中断时补充
+        self._descriptions = {
+            name: f"{description_prefix}: {name}" for name in self._tools_schema
+        }
+        # check_all 模式下的工具名索引与推断 schema 缓存，工具列表对象变化时整体失效
+        self._tools_id: int | None = None
+        self._tools_index: dict[str, Any] = {}
+        self._inferred_schemas: dict[str, dict[str, ParamSchema]] = {}
+        # 工具名 -> 必填参数名，首次检查该工具时计算
+        self._required_params: dict[str, tuple[str, ...]] = {}
+        # 工具名 -> 序列化后的参数 schema（interrupt 负载），schema 静态不变
+        self._schema_dumps: dict[str, dict[str, dict[str, Any]]] = {}
+        self._tools_bound = False
+
+    def bind_tools(self, tools: Sequence[BaseTool]) -> None:
+        """绑定 Agent 的工具列表，check_all 模式下按工具名查找 schema.
+
+        由 Agent 构建时调用一次；绑定后不再从 state 中探测 _tools。
+        """
+        self._index_tools(tools)
+        self._tools_bound = True
 
     # ------------------------------------------------------------------
     # after_model: 解析 LLM 输出的 ```params_request``` 结构化格式
@@ -190,7 +292,7 @@ class MissingParamsMiddleware(AgentMiddleware[MissingParamsState, ContextT]):
             return None
 
         # 如果已有 tool_calls，跳过（让 before_tool 处理）
-        if hasattr(last_message, "tool_calls") and last_message.tool_calls:
+        if last_message.tool_calls:
             return None
 
         content = last_message.content
@@ -221,27 +323,25 @@ class MissingParamsMiddleware(AgentMiddleware[MissingParamsState, ContextT]):
 
         tool_call_id = str(uuid.uuid4())
 
-        info = MissingParamsInfo(
-            tool_name=tool_name,
-            tool_call_id=tool_call_id,
-            description=f"{self._description_prefix}: {tool_name}",
-            current_params=known_params,
-            missing_params=missing,
-            params_schema=params_schema,
-        )
-
         logger.info(
             f"MissingParamsMiddleware(after_model): "
             f"解析到 params_request，工具={tool_name}，缺少参数={missing}"
         )
 
         # 触发 interrupt → 前端展示表单
-        result = interrupt({"type": "params_edit", "info": info.model_dump()})
+        result = interrupt(
+            {
+                "type": "params_edit",
+                "info": self._build_params_info(
+                    tool_name, tool_call_id, known_params, missing, params_schema
+                ),
+            }
+        )
 
         action = result.get("action", "cancel")
         if action == "submit":
             edited_params = result.get("params", {})
-            merged_args = {**known_params, **edited_params}
+            merged_args = known_params | edited_params
 
             # 构造合成 tool_call，替换原始文本消息
             return {
@@ -249,9 +349,7 @@ class MissingParamsMiddleware(AgentMiddleware[MissingParamsState, ContextT]):
                     AIMessage(
                         content=cleaned_content or "",
                         id=last_message.id,
-                        response_metadata=getattr(
-                            last_message, "response_metadata", {}
-                        ),
+                        response_metadata=last_message.response_metadata,
                         tool_calls=[
                             {
                                 "name": tool_name,
@@ -270,9 +368,7 @@ class MissingParamsMiddleware(AgentMiddleware[MissingParamsState, ContextT]):
                     AIMessage(
                         content=(cleaned_content or "") + "\n\n操作已取消。",
                         id=last_message.id,
-                        response_metadata=getattr(
-                            last_message, "response_metadata", {}
-                        ),
+                        response_metadata=last_message.response_metadata,
                     )
                 ]
             }
@@ -281,16 +377,19 @@ class MissingParamsMiddleware(AgentMiddleware[MissingParamsState, ContextT]):
         self, content: str
     ) -> tuple[str, dict[str, Any] | None]:
         """从消息内容中解析 ```params_request {...}``` 块."""
-        pattern = r"```params_request\s*(\{[\s\S]*?\})\s*```"
-        match = re.search(pattern, content, re.IGNORECASE)
+        # 绝大多数回复不含代码块：用 C 层子串查找快速排除，省去正则扫描
+        if "```" not in content:
+            return content, None
+
+        match = _PARAMS_REQUEST_RE.search(content)
         if not match:
             return content, None
 
         try:
-            data = json.loads(match.group(1))
-            cleaned = re.sub(pattern, "", content, flags=re.IGNORECASE).strip()
+            data = orjson.loads(match.group(1))
+            cleaned = _PARAMS_REQUEST_RE.sub("", content).strip()
             return cleaned, data
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             logger.warning("MissingParamsMiddleware: params_request JSON 解析失败")
             return content, None
 
@@ -305,6 +404,10 @@ class MissingParamsMiddleware(AgentMiddleware[MissingParamsState, ContextT]):
     ) -> dict[str, Any] | None:
         """在工具执行前检查缺省参数."""
         tool_name = tool_call.get("name", "")
+        # 未配置该工具且未开启 check_all 时直接放行，不做任何 schema 查找
+        if not self._check_all and tool_name not in self._tools_schema:
+            return None
+
         tool_call_id = tool_call.get("id", "")
         tool_args = tool_call.get("args", {})
 
@@ -314,27 +417,15 @@ class MissingParamsMiddleware(AgentMiddleware[MissingParamsState, ContextT]):
             return None
 
         # 检测缺失的必填参数
-        missing = []
-        for param_name, schema in params_schema.items():
-            if not schema.is_required():
-                continue
-            value = tool_args.get(param_name)
-            if self._is_empty_value(value):
-                missing.append(param_name)
+        missing = [
+            param_name
+            for param_name in self._get_required_params(tool_name, params_schema)
+            if self._is_empty_value(tool_args.get(param_name))
+        ]
 
         if not missing:
             return None
 
-        # 构建缺省参数信息
-        info = MissingParamsInfo(
-            tool_name=tool_name,
-            tool_call_id=tool_call_id,
-            description=f"{self._description_prefix}: {tool_name}",
-            current_params=tool_args,
-            missing_params=missing,
-            params_schema=params_schema,
-        )
-
         logger.info(
             f"MissingParamsMiddleware: 检测到工具 {tool_name} 缺少参数 {missing}，触发 interrupt"
         )
@@ -343,7 +434,9 @@ class MissingParamsMiddleware(AgentMiddleware[MissingParamsState, ContextT]):
         result = interrupt(
             {
                 "type": "params_edit",
-                "info": info.model_dump(),
+                "info": self._build_params_info(
+                    tool_name, tool_call_id, tool_args, missing, params_schema
+                ),
             }
         )
 
@@ -352,7 +445,7 @@ class MissingParamsMiddleware(AgentMiddleware[MissingParamsState, ContextT]):
         if action == "submit":
             # 用户提交了参数，更新 tool_args
             edited_params = result.get("params", {})
-            merged_args = {**tool_args, **edited_params}
+            merged_args = tool_args | edited_params
             # 返回更新后的 tool_call
             return {
                 "tool_call": {
@@ -364,11 +457,10 @@ class MissingParamsMiddleware(AgentMiddleware[MissingParamsState, ContextT]):
             # 用户取消，可以选择跳过工具执行或抛出异常
             logger.info(f"MissingParamsMiddleware: 用户取消了参数编辑")
             # 返回一个特殊标记，让工具不执行
-            from langchain_core.messages import ToolMessage
             return {
                 "messages": [
                     ToolMessage(
-                        content="用户取消了参数编辑，操作已终止。",
+                        content=_CANCEL_CONTENT,
                         tool_call_id=tool_call_id,
                         name=tool_name,
                         status="error",
@@ -386,7 +478,8 @@ class MissingParamsMiddleware(AgentMiddleware[MissingParamsState, ContextT]):
     ) -> dict[str, ParamSchema] | None:
         """获取工具的参数 schema.
 
-        优先使用配置的 schema，否则尝试从工具的 args_schema 推断。
+        优先使用配置的 schema；开启 check_all 时依次使用工具上 @param_edit
+        挂载的 schema、从工具的 args_schema 推断。
         """
         # 优先使用配置
         if tool_name in self._tools_schema:
@@ -395,67 +488,168 @@ class MissingParamsMiddleware(AgentMiddleware[MissingParamsState, ContextT]):
         if not self._check_all:
             return None
 
-        # 从 state 中的 tools 推断（如果有的话）
-        # 这需要 agent 在构建时传入工具列表
-        tools = getattr(state, "_tools", None)
-        if not tools:
+        # 未通过 bind_tools 绑定工具列表时，回退到 state 中的 tools（如果有的话）
+        if not self._tools_bound:
+            tools = getattr(state, "_tools", None)
+            if not tools:
+                return None
+            if self._tools_id != id(tools):
+                self._index_tools(tools)
+
+        cached = self._inferred_schemas.get(tool_name)
+        if cached is not None:
+            return cached
+
+        tool = self._tools_index.get(tool_name)
+        if tool is None:
             return None
 
-        for tool in tools:
-            if tool.name == tool_name and tool.args_schema:
-                return self._infer_schema_from_pydantic(tool.args_schema)
+        # @param_edit 已挂载显式 schema 时直接使用，不做 Pydantic 推断
+        schema = getattr(tool, "_param_edit_schema", None)
+        if schema is None and tool.args_schema:
+            schema = self._infer_schema_from_pydantic(tool.args_schema)
+        if schema is not None:
+            self._inferred_schemas[tool_name] = schema
+        return schema
+
+    def _index_tools(self, tools: Sequence[BaseTool]) -> None:
+        """建立工具名索引，并清空依赖旧工具列表的缓存."""
+        self._tools_id = id(tools)
+        self._tools_index = {tool.name: tool for tool in tools}
+        self._inferred_schemas = {}
+        self._required_params = {}
+        self._schema_dumps = {}
+
+    def _get_required_params(
+        self,
+        tool_name: str,
+        params_schema: dict[str, ParamSchema],
+    ) -> tuple[str, ...]:
+        """获取工具的必填参数名，按工具名缓存，避免每次调用都逐个判断 is_required()."""
+        required = self._required_params.get(tool_name)
+        if required is None:
+            required = tuple(
+                name for name, schema in params_schema.items() if schema.is_required()
+            )
+            self._required_params[tool_name] = required
+        return required
 
-        return None
+    def _build_params_info(
+        self,
+        tool_name: str,
+        tool_call_id: str,
+        current_params: dict[str, Any],
+        missing: list[str],
+        params_schema: dict[str, ParamSchema],
+    ) -> dict[str, Any]:
+        """构造 params_edit interrupt 的 info 负载.
+
+        结构与 MissingParamsInfo 一致；输入均由本 middleware 生成，
+        直接构造 dict，省去模型校验与 model_dump() 往返。
+        """
+        description = self._descriptions.get(tool_name)
+        if description is None:
+            description = f"{self._description_prefix}: {tool_name}"
+            self._descriptions[tool_name] = description
+
+        return {
+            "tool_name": tool_name,
+            "tool_call_id": tool_call_id,
+            "description": description,
+            "current_params": current_params,
+            "missing_params": missing,
+            "params_schema": self._dump_params_schema(tool_name, params_schema),
+        }
+
+    def _dump_params_schema(
+        self,
+        tool_name: str,
+        params_schema: dict[str, ParamSchema],
+    ) -> dict[str, dict[str, Any]]:
+        """获取参数 schema 的序列化形式（省略 None 字段），按工具名缓存.
+
+        返回的 dict 会被多次 interrupt 共享，不得原地修改。
+        """
+        dumped = self._schema_dumps.get(tool_name)
+        if dumped is None:
+            dumped = {
+                name: schema.model_dump(exclude_none=True)
+                for name, schema in params_schema.items()
+            }
+            self._schema_dumps[tool_name] = dumped
+        return dumped
 
     def _infer_schema_from_pydantic(
         self,
-        schema_class: type,
+        schema_class: Any,
     ) -> dict[str, ParamSchema]:
-        """从 Pydantic 模型推断参数 schema."""
-        try:
-            json_schema = schema_class.model_json_schema()
-            properties = json_schema.get("properties", {})
-            required = set(json_schema.get("required", []))
-
-            result = {}
-            for name, prop in properties.items():
-                param_type = prop.get("type", "string")
-                # 如果不在 required 中，添加 null 类型
-                if name not in required:
-                    if isinstance(param_type, list):
-                        if "null" not in param_type:
-                            param_type = param_type + ["null"]
-                    else:
-                        param_type = [param_type, "null"]
-
-                result[name] = ParamSchema(
-                    type=param_type,
-                    title=prop.get("title", name),
-                    description=prop.get("description"),
-                    default=prop.get("default"),
-                    enum=prop.get("enum"),
-                    minimum=prop.get("minimum"),
-                    maximum=prop.get("maximum"),
-                    minLength=prop.get("minLength"),
-                    maxLength=prop.get("maxLength"),
-                    pattern=prop.get("pattern"),
-                    format=prop.get("format"),
-                )
-
-            return result
-        except Exception as e:
-            logger.warning(f"无法从 Pydantic 模型推断 schema: {e}")
-            return {}
+        """从 Pydantic 模型推断参数 schema（结果按模型类缓存）.
+
+        args_schema 也可能是 JSON Schema dict（不可哈希），此时不走缓存。
+        """
+        if isinstance(schema_class, type):
+            return _infer_params_schema_cached(schema_class)
+        return _infer_params_schema(schema_class)
 
     def _is_empty_value(self, value: Any) -> bool:
         """判断值是否为空/缺省."""
-        if value is None:
-            return True
-        if isinstance(value, str) and not value.strip():
-            return True
-        if isinstance(value, (list, dict)) and len(value) == 0:
-            return True
-        return False
+        check = _EMPTY_CHECKS.get(type(value))
+        return check is not None and check(value)
+
+
+# ---------------------------------------------------------------------------
+# Schema 推断 - 仅取决于 args_schema 类本身，按类缓存
+# ---------------------------------------------------------------------------
+
+
+# 从 JSON Schema property 中原样带入 ParamSchema 的字段
+_INFERRED_SCHEMA_KEYS = (
+    "description",
+    "default",
+    "enum",
+    "minimum",
+    "maximum",
+    "minLength",
+    "maxLength",
+    "pattern",
+    "format",
+)
+
+
+def _infer_params_schema(schema_class: Any) -> dict[str, ParamSchema]:
+    """从 Pydantic 模型推断参数 schema，无法推断时返回空 dict."""
+    try:
+        json_schema = schema_class.model_json_schema()
+        properties = json_schema.get("properties", {})
+        required = set(json_schema.get("required", []))
+
+        result = {}
+        for name, prop in properties.items():
+            param_type = prop.get("type", "string")
+            # 如果不在 required 中，添加 null 类型
+            if name not in required:
+                if isinstance(param_type, list):
+                    if "null" not in param_type:
+                        param_type = param_type + ["null"]
+                else:
+                    param_type = [param_type, "null"]
+
+            # prop 来自 Pydantic 自身生成的 JSON Schema，跳过字段校验直接构造
+            result[name] = ParamSchema.model_construct(
+                type=param_type,
+                title=prop.get("title", name),
+                **{k: prop[k] for k in _INFERRED_SCHEMA_KEYS if k in prop},
+            )
+
+        return result
+    except Exception as e:
+        logger.warning(f"无法从 Pydantic 模型推断 schema: {e}")
+        return {}
+
+
+# 按模型类缓存：model_json_schema() 与 ParamSchema 构造只在每个模型类首次出现时执行；
+# 返回的 dict 为各调用方共享，不得原地修改。仅接受可哈希的类对象
+_infer_params_schema_cached = functools.lru_cache(maxsize=256)(_infer_params_schema)
 
 
 # ---------------------------------------------------------------------------
@@ -463,6 +657,19 @@ class MissingParamsMiddleware(AgentMiddleware[MissingParamsState, ContextT]):
 # ---------------------------------------------------------------------------
 
 
+# 享元池：字段完全相同的 ParamSchema 共享同一实例（ParamSchema 不可变）
+_SCHEMA_POOL: dict[str, ParamSchema] = {}
+
+
+def _param_schema(**fields: Any) -> ParamSchema:
+    """按字段取值复用 ParamSchema 实例，供下方各 *_param 辅助函数使用."""
+    key = repr(fields)
+    schema = _SCHEMA_POOL.get(key)
+    if schema is None:
+        schema = _SCHEMA_POOL[key] = ParamSchema(**fields)
+    return schema
+
+
 def param_edit(schema: dict[str, ParamSchema]):
     """Decorator: attach param_edit_schema directly on a @tool instance.
 
@@ -502,7 +709,7 @@ def string_param(
     max_length: int | None = None,
 ) -> ParamSchema:
     """创建字符串类型参数 schema."""
-    return ParamSchema(
+    return _param_schema(
         type="string" if required else ["string", "null"],
         title=title,
         description=description,
@@ -526,7 +733,7 @@ def number_param(
     step: float | None = None,
 ) -> ParamSchema:
     """创建数值类型参数 schema."""
-    return ParamSchema(
+    return _param_schema(
         type="number" if required else ["number", "null"],
         title=title,
         description=description,
@@ -547,7 +754,7 @@ def integer_param(
     maximum: int | None = None,
 ) -> ParamSchema:
     """创建整数类型参数 schema."""
-    return ParamSchema(
+    return _param_schema(
         type="integer" if required else ["integer", "null"],
         title=title,
         description=description,
@@ -565,7 +772,7 @@ def boolean_param(
     required: bool = True,
 ) -> ParamSchema:
     """创建布尔类型参数 schema."""
-    return ParamSchema(
+    return _param_schema(
         type="boolean" if required else ["boolean", "null"],
         title=title,
         description=description,
@@ -583,7 +790,7 @@ def select_param(
     display_labels: dict[str, str] | None = None,
 ) -> ParamSchema:
     """创建下拉选择参数 schema."""
-    return ParamSchema(
+    return _param_schema(
         type="string" if required else ["string", "null"],
         title=title,
         description=description,
@@ -601,7 +808,7 @@ def date_param(
     required: bool = True,
 ) -> ParamSchema:
     """创建日期类型参数 schema."""
-    return ParamSchema(
+    return _param_schema(
         type="string" if required else ["string", "null"],
         title=title,
         description=description,
@@ -618,7 +825,7 @@ def datetime_param(
     required: bool = True,
 ) -> ParamSchema:
     """创建日期时间类型参数 schema."""
-    return ParamSchema(
+    return _param_schema(
         type="string" if required else ["string", "null"],
         title=title,
         description=description,
@@ -639,7 +846,7 @@ def array_param(
     placeholder: str | None = None,
 ) -> ParamSchema:
     """创建数组类型参数 schema."""
-    return ParamSchema(
+    return _param_schema(
         type="array" if required else ["array", "null"],
         title=title,
         description=description,
@@ -660,7 +867,7 @@ def multiline_param(
     placeholder: str | None = None,
 ) -> ParamSchema:
     """创建多行文本参数 schema."""
-    return ParamSchema(
+    return _param_schema(
         type="string" if required else ["string", "null"],
         title=title,
         description=description,
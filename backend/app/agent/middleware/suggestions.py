@@ -2,19 +2,38 @@
 
 from __future__ import annotations
 
-import json
 import re
+from dataclasses import dataclass, field
 from typing import Any
 
+import orjson
 from langchain.agents import AgentState
 from langchain.agents.middleware import AgentMiddleware
 from langchain_core.messages import AIMessage
 from langgraph.runtime import Runtime
 from langgraph.typing import ContextT
-from pydantic import BaseModel
 
+# 建议块格式: ```suggestions {...} ```（group 1）与 <suggestions>...</suggestions>（group 2），
+# 合并为一个交替正则，一次扫描即可定位两种格式的全部块
+_SUGG_BLOCK_RE = re.compile(
+    r"```suggestions\s*(\{[\s\S]*?\})\s*```|<suggestions>([\s\S]*?)</suggestions>",
+    re.IGNORECASE,
+)
 
-class Suggestion(BaseModel):
+
+def _remove_spans(content: str, spans: list[tuple[int, int]]) -> str:
+    """按 (start, end) 区间切除内容片段并去除首尾空白."""
+    pieces: list[str] = []
+    pos = 0
+    for start, end in spans:
+        pieces.append(content[pos:start])
+        pos = end
+    pieces.append(content[pos:])
+    return "".join(pieces).strip()
+
+
+@dataclass(slots=True)
+class Suggestion:
     """单个建议选项."""
 
     id: str
@@ -22,10 +41,15 @@ class Suggestion(BaseModel):
     value: str | None = None
 
 
-class SuggestionsData(BaseModel):
-    """建议选项数据结构."""
+@dataclass(slots=True)
+class SuggestionsData:
+    """建议选项数据结构.
 
-    suggestions: list[Suggestion]
+    仅承载已解析的字符串，不需要 Pydantic 校验；字段类型由
+    _normalize_suggestions 负责规范化。
+    """
+
+    suggestions: list[Suggestion] = field(default_factory=list)
     multi_select: bool = False
     prompt: str | None = None
 
@@ -62,7 +86,7 @@ class SuggestionsMiddleware(AgentMiddleware[SuggestionsState, ContextT]):
         if not isinstance(last_message, AIMessage):
             return None
 
-        if hasattr(last_message, "tool_calls") and last_message.tool_calls:
+        if last_message.tool_calls:
             return None
 
         content = last_message.content
@@ -80,7 +104,7 @@ class SuggestionsMiddleware(AgentMiddleware[SuggestionsState, ContextT]):
         updated_message = AIMessage(
             content=cleaned_content,
             id=last_message.id,
-            response_metadata=getattr(last_message, "response_metadata", {}),
+            response_metadata=last_message.response_metadata,
         )
 
         return {
@@ -99,38 +123,50 @@ class SuggestionsMiddleware(AgentMiddleware[SuggestionsState, ContextT]):
         Returns:
             tuple of (清理后的内容, 建议数据或 None)
         """
+        # 两种格式分别以 ``` 与 < 开头：均不出现时（多数回复）直接跳过正则扫描
+        if "```" not in content and "<" not in content:
+            return content, None
+
         suggestions_data = None
         cleaned_content = content
 
+        # 单次扫描收集两种格式的块区间，各自只解析第一个块
+        json_spans: list[tuple[int, int]] = []
+        xml_spans: list[tuple[int, int]] = []
+        json_body: str | None = None
+        xml_body: str | None = None
+        for match in _SUGG_BLOCK_RE.finditer(content):
+            body = match.group(1)
+            if body is not None:
+                json_spans.append(match.span())
+                if json_body is None:
+                    json_body = body
+            else:
+                xml_spans.append(match.span())
+                if xml_body is None:
+                    xml_body = match.group(2)
+
         # 尝试 JSON 代码块格式: ```suggestions { ... } ```
-        json_pattern = r"```suggestions\s*(\{[\s\S]*?\})\s*```"
-        match = re.search(json_pattern, content, re.IGNORECASE)
-        if match:
+        if json_body is not None:
             try:
-                raw_data = json.loads(match.group(1))
+                raw_data = orjson.loads(json_body)
                 suggestions_data = self._normalize_suggestions(raw_data)
-                cleaned_content = re.sub(
-                    json_pattern, "", content, flags=re.IGNORECASE
-                ).strip()
-            except json.JSONDecodeError:
+                cleaned_content = _remove_spans(content, json_spans)
+            except orjson.JSONDecodeError:
                 pass
 
         # 尝试 XML 标签格式: <suggestions>...</suggestions>
         if not suggestions_data:
-            xml_pattern = r"<suggestions>([\s\S]*?)</suggestions>"
-            match = re.search(xml_pattern, content, re.IGNORECASE)
-            if match:
+            if xml_body is not None:
                 try:
-                    raw_data = json.loads(match.group(1))
+                    raw_data = orjson.loads(xml_body)
                     suggestions_data = self._normalize_suggestions(raw_data)
-                    cleaned_content = re.sub(
-                        xml_pattern, "", content, flags=re.IGNORECASE
-                    ).strip()
-                except json.JSONDecodeError:
+                    cleaned_content = _remove_spans(content, xml_spans)
+                except orjson.JSONDecodeError:
                     # 尝试按行解析（每行一个建议）
                     lines = [
                         line.strip()
-                        for line in match.group(1).strip().split("\n")
+                        for line in xml_body.strip().split("\n")
                         if line.strip()
                     ]
                     if lines:
@@ -141,32 +177,26 @@ class SuggestionsMiddleware(AgentMiddleware[SuggestionsState, ContextT]):
                             ],
                             multi_select=False,
                         )
-                        cleaned_content = re.sub(
-                            xml_pattern, "", content, flags=re.IGNORECASE
-                        ).strip()
+                        cleaned_content = _remove_spans(content, xml_spans)
 
         return cleaned_content, suggestions_data
 
     def _normalize_suggestions(
         self, raw_data: dict[str, Any]
     ) -> SuggestionsData:
-        """规范化建议数据，确保每个建议都有 id."""
+        """规范化建议数据，确保每个建议都有 id（缺省为从 1 开始的序号）."""
         suggestions = raw_data.get("suggestions", [])
-        normalized = []
-        for i, s in enumerate(suggestions):
-            if isinstance(s, dict):
-                normalized.append(
-                    Suggestion(
-                        id=s.get("id", str(i + 1)),
-                        text=s.get("text", ""),
-                        value=s.get("value"),
-                    )
-                )
-            elif isinstance(s, str):
-                normalized.append(Suggestion(id=str(i + 1), text=s))
+        normalized: list[Suggestion] = []
+        append = normalized.append
+        for i, s in enumerate(suggestions, 1):
+            if isinstance(s, str):
+                append(Suggestion(str(i), s))
+            elif isinstance(s, dict):
+                get = s.get
+                append(Suggestion(str(get("id", i)), str(get("text", "")), get("value")))
 
         return SuggestionsData(
             suggestions=normalized,
-            multi_select=raw_data.get("multi_select", False),
+            multi_select=bool(raw_data.get("multi_select", False)),
             prompt=raw_data.get("prompt"),
         )
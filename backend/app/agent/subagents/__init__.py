@@ -13,7 +13,7 @@
     )
 
     # 将 task() tool 注入主 Agent
-    all_tools.extend(subagent_mw.tools)
+    all_tools = (*tool_registry.get_all_tools(), *subagent_mw.tools)
 
     # 加入 middleware 管道
     middleware = [subagent_mw, ...]
@@ -9,16 +9,22 @@
 
 from __future__ import annotations
 
-import json
 import logging
 from typing import Any
 
+import orjson
 from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
 
 from app.agent.subagents.types import ReactiveSubAgentConfig
 
 logger = logging.getLogger(__name__)
 
+# 合法的步骤状态，其余值一律回退为 pending
+_VALID_STATUSES = frozenset({"pending", "in_progress", "completed"})
+
+# 上下文中"最近操作"覆盖的消息条数
+_RECENT_WINDOW = 8
+
 
 # ---------------------------------------------------------------------------
 # 系统提示词
@@ -64,6 +70,25 @@ TODO_SYSTEM_PROMPT = """\
 # Context Builder
 # ---------------------------------------------------------------------------
 
+def _summarize_action(msg: Any) -> str | None:
+    """将单条 AI / 工具消息概括为一行操作摘要，其余消息返回 None."""
+    if isinstance(msg, ToolMessage):
+        status = "失败" if msg.status == "error" else "成功"
+        return f"[工具结果] {msg.name}: {status}"
+    if isinstance(msg, AIMessage):
+        # 属性读取绑定到局部变量，每个属性只访问一次
+        tool_calls = msg.tool_calls
+        if tool_calls:
+            return f"[调用工具] {', '.join(tc.get('name', '?') for tc in tool_calls)}"
+        content = msg.content
+        if content:
+            text = content if isinstance(content, str) else str(content)
+            if len(text) > 150:
+                text = text[:150] + "..."
+            return f"[AI回复] {text}"
+    return None
+
+
 def build_todo_context(state: dict[str, Any]) -> list[HumanMessage] | None:
     """从 parent state 提取精简上下文供 TODO 子 Agent 使用.
 
@@ -78,53 +103,47 @@ def build_todo_context(state: dict[str, Any]) -> list[HumanMessage] | None:
 
     current_todos = state.get("todos", [])
 
-    # 查找最近的用户消息
+    # 单次逆序遍历：最后 _RECENT_WINDOW 条消息提取操作摘要，同时查找最近的用户消息；
+    # 窗口已扫完且找到用户消息后立即停止，不再走到历史开头
     user_task = None
-    for msg in reversed(messages):
-        if isinstance(msg, HumanMessage) or (
-            hasattr(msg, "type") and getattr(msg, "type", None) == "human"
+    recent_actions: list[str] = []
+    for i, msg in enumerate(reversed(messages)):
+        if i < _RECENT_WINDOW:
+            action = _summarize_action(msg)
+            if action is not None:
+                recent_actions.append(action)
+        elif user_task is not None:
+            break
+
+        if user_task is None and (
+            isinstance(msg, HumanMessage) or getattr(msg, "type", None) == "human"
         ):
-            content = msg.content if hasattr(msg, "content") else str(msg)
+            content = getattr(msg, "content", msg)
             user_task = content[:300] if isinstance(content, str) else str(content)[:300]
-            break
 
     if not user_task:
         return None
 
-    # 提取最近操作（最后 8 条消息）
-    recent_actions: list[str] = []
-    for msg in messages[-8:]:
-        if isinstance(msg, AIMessage):
-            if hasattr(msg, "tool_calls") and msg.tool_calls:
-                names = [tc.get("name", "?") for tc in msg.tool_calls]
-                recent_actions.append(f"[调用工具] {', '.join(names)}")
-            elif msg.content:
-                text = msg.content if isinstance(msg.content, str) else str(msg.content)
-                if len(text) > 150:
-                    text = text[:150] + "..."
-                recent_actions.append(f"[AI回复] {text}")
-        elif isinstance(msg, ToolMessage):
-            name = getattr(msg, "name", "?")
-            status = "失败" if getattr(msg, "status", None) == "error" else "成功"
-            recent_actions.append(f"[工具结果] {name}: {status}")
-
-    # 组装上下文
-    parts = [f"用户任务: {user_task}"]
+    recent_actions.reverse()
+
+    # 组装上下文：所有行放入同一列表，最后一次 join（段落之间以空行分隔）
+    lines = [f"用户任务: {user_task}", ""]
 
     if current_todos:
-        todos_lines = "\n".join(
+        lines.append("当前步骤:")
+        lines.extend(
             f"- [{t.get('status', 'pending')}] {t.get('content', '')}"
             for t in current_todos
         )
-        parts.append(f"当前步骤:\n{todos_lines}")
     else:
-        parts.append("当前没有任务步骤，请根据 Agent 活动创建初始步骤。")
+        lines.append("当前没有任务步骤，请根据 Agent 活动创建初始步骤。")
 
     if recent_actions:
-        parts.append("最近操作:\n" + "\n".join(recent_actions))
+        lines.append("")
+        lines.append("最近操作:")
+        lines.extend(recent_actions)
 
-    context = "\n\n".join(parts)
-    return [HumanMessage(content=context)]
+    return [HumanMessage(content="\n".join(lines))]
 
 
 # ---------------------------------------------------------------------------
@@ -144,19 +163,20 @@ def parse_todo_result(raw_output: str) -> dict[str, Any] | None:
     content = raw_output.strip()
 
     # 去除 markdown 代码块标记
+    # 直接按换行位置切片，不拆分成行列表再拼接
     if content.startswith("```"):
-        lines = content.split("\n")
         # 去掉首行 ``` 或 ```json
-        if lines[0].strip().startswith("```"):
-            lines = lines[1:]
+        first_nl = content.find("\n")
+        content = content[first_nl + 1 :] if first_nl >= 0 else ""
         # 去掉尾行 ```
-        if lines and lines[-1].strip() == "```":
-            lines = lines[:-1]
-        content = "\n".join(lines).strip()
+        last_nl = content.rfind("\n")
+        if content[last_nl + 1 :].strip() == "```":
+            content = content[:last_nl] if last_nl >= 0 else ""
+        content = content.strip()
 
     try:
-        data = json.loads(content)
-    except json.JSONDecodeError:
+        data = orjson.loads(content)
+    except orjson.JSONDecodeError:
         logger.warning(
             f"todo_tracker: JSON 解析失败, content={content[:200]}"
         )
@@ -174,7 +194,7 @@ def parse_todo_result(raw_output: str) -> dict[str, Any] | None:
         s = str(item.get("status", "pending")).strip()
         if not c:
             continue
-        if s not in ("pending", "in_progress", "completed"):
+        if s not in _VALID_STATUSES:
             s = "pending"
         normalized.append({"content": c, "status": s})
 
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import threading
+
 from langchain.agents import create_agent
 from langchain.tools import tool
 
@@ -49,21 +51,25 @@ def generate_summary(data: str) -> str:
 # ---------------------------------------------------------------------------
 
 _sub_agent = None
+_sub_agent_lock = threading.Lock()
 
 
 def _get_sub_agent():
     global _sub_agent
     if _sub_agent is None:
-        from app.config import settings
-
-        _sub_agent = create_agent(
-            model=settings.llm_model,
-            tools=[query_database, generate_summary],
-            system_prompt=(
-                "你是数据分析专家。你可以使用 query_database 查询数据，"
-                "使用 generate_summary 生成分析摘要。请根据用户需求完成数据分析任务。"
-            ),
-        )
+        # Double-checked: concurrent first calls must not each compile the graph
+        with _sub_agent_lock:
+            if _sub_agent is None:
+                from app.config import settings
+
+                _sub_agent = create_agent(
+                    model=settings.llm_model,
+                    tools=[query_database, generate_summary],
+                    system_prompt=(
+                        "你是数据分析专家。你可以使用 query_database 查询数据，"
+                        "使用 generate_summary 生成分析摘要。请根据用户需求完成数据分析任务。"
+                    ),
+                )
     return _sub_agent
 
 
@@ -1,21 +1,27 @@
 """SubAgentMiddleware: 统一处理委派式与响应式子 Agent.
 
 参考 deepagents SubAgentMiddleware 架构:
-- 委派式: 注册 task(agent_name, description) tool，主 LLM 显式调用
+- 委派式: 注册 task(agent_name, description) tool，主 LLM 显式调用；
+  可选 batch_task(invocations) tool，一次并发委派多个任务
 - 响应式: after_model hook 自动触发，不依赖主 LLM（deepagents 扩展）
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Any
 
+import orjson
 from langchain.agents import AgentState
 from langchain.agents.middleware import AgentMiddleware
-from langchain_core.tools import BaseTool
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from langchain_core.tools import BaseTool, StructuredTool
 from langchain.tools import tool
+from langgraph.config import get_config
 from langgraph.runtime import Runtime
 from langgraph.typing import ContextT
+from typing_extensions import TypedDict  # pydantic 在 Python < 3.12 需要此版本生成 tool schema
 
 from app.agent.subagents.runner import SubAgentRunner
 from app.agent.subagents.types import (
@@ -27,6 +33,15 @@ from app.agent.subagents.types import (
 logger = logging.getLogger(__name__)
 
 
+def _current_thread_id() -> Any:
+    """当前图执行所属会话的 thread_id；不在图执行上下文中时返回 None."""
+    try:
+        config = get_config()
+    except RuntimeError:
+        return None
+    return (config.get("configurable") or {}).get("thread_id")
+
+
 # ---------------------------------------------------------------------------
 # State Schema
 # ---------------------------------------------------------------------------
@@ -41,6 +56,13 @@ class SubAgentState(AgentState):
     todos: list[dict[str, Any]]
 
 
+class TaskInvocation(TypedDict):
+    """batch_task() 的单个委派任务."""
+
+    agent_name: str
+    task_description: str
+
+
 # ---------------------------------------------------------------------------
 # SubAgentMiddleware
 # ---------------------------------------------------------------------------
@@ -52,6 +74,8 @@ class SubAgentMiddleware(AgentMiddleware[SubAgentState, ContextT]):
         - 构建 task(agent_name, description) tool
         - 主 LLM 调用 task() 时路由到对应子 Agent
         - 子 Agent 以隔离上下文运行，仅返回最终结果
+        - max_batch_concurrency > 0 时额外提供 batch_task(invocations)，
+          在一次工具调用中并发执行多个委派任务
 
     响应式子 Agent:
         - 在 after_model hook 中自动触发
@@ -67,6 +91,7 @@ class SubAgentMiddleware(AgentMiddleware[SubAgentState, ContextT]):
         self,
         delegated: list[SubAgentConfig] | None = None,
         reactive: list[ReactiveSubAgentConfig] | None = None,
+        max_batch_concurrency: int = 0,
     ) -> None:
         self._runner = SubAgentRunner()
 
@@ -85,8 +110,26 @@ class SubAgentMiddleware(AgentMiddleware[SubAgentState, ContextT]):
             hook = cfg["trigger_hook"]
             self._reactive_by_hook.setdefault(hook, []).append((cfg, compiled))
 
-        # 构建 task() tool
+        # 每个响应式子 Agent 上次产生更新时的触发签名，用于跳过同一轮的重复触发
+        self._last_signatures: dict[str, tuple[Any, ...]] = {}
+
+        # 同一 hook 下有多个响应式子 Agent 时，同步路径用线程池并发调用
+        # （各子 Agent 管理互不相交的 state key，彼此独立；
+        #  ContextThreadPoolExecutor 会把当前 runnable config / 回调上下文带入工作线程）
+        max_per_hook = max((len(v) for v in self._reactive_by_hook.values()), default=0)
+        self._reactive_pool = (
+            ContextThreadPoolExecutor(max_workers=max_per_hook, thread_name_prefix="reactive-subagent")
+            if max_per_hook > 1
+            else None
+        )
+
+        # 构建 task() tool（及可选的 batch_task() tool）
         self._task_tool = self._build_task_tool() if self._delegated else None
+        self._batch_task_tool = (
+            self._build_batch_task_tool(max_batch_concurrency)
+            if self._delegated and max_batch_concurrency > 0
+            else None
+        )
 
         # 日志
         n_delegated = len(self._delegated)
@@ -105,10 +148,9 @@ class SubAgentMiddleware(AgentMiddleware[SubAgentState, ContextT]):
         """返回需要注入主 Agent tools 列表的工具.
 
         使用方式 (core.py):
-            all_tools = tool_registry.get_all_tools()
-            all_tools.extend(subagent_mw.tools)
+            all_tools = (*tool_registry.get_all_tools(), *subagent_mw.tools)
         """
-        return [self._task_tool] if self._task_tool else []
+        return [t for t in (self._task_tool, self._batch_task_tool) if t is not None]
 
     # ------------------------------------------------------------------
     # Middleware Hook: after_model
@@ -119,16 +161,86 @@ class SubAgentMiddleware(AgentMiddleware[SubAgentState, ContextT]):
 
         遍历所有注册在 after_model hook 的 reactive 子 Agent:
         1. 检查 trigger_condition（如果定义）
-        2. 调用 runner.invoke_reactive
-        3. 合并所有 state 更新
+        2. 触发签名与上次更新时相同则跳过（同一条消息、步骤状态未变）
+        3. 调用 runner.invoke_reactive（多个子 Agent 时并发调用）
+        4. 合并所有 state 更新
+        """
+        reactive_list = self._reactive_by_hook.get("after_model")
+        # 整个 hook 共用的前置条件：无消息历史时没有可供子 Agent 跟踪的内容
+        if not reactive_list or not state.get("messages"):
+            return None
+
+        triggered, signature = self._triggered(reactive_list, state)
+        if not triggered:
+            return None
+
+        # 调用子 Agent：单个时直接调用，多个时并发，总耗时取决于最慢的一个
+        if len(triggered) > 1 and self._reactive_pool is not None:
+            updates = list(
+                self._reactive_pool.map(
+                    lambda item: self._runner.invoke_reactive(item[1], state), triggered
+                )
+            )
+        else:
+            updates = [self._runner.invoke_reactive(compiled, state) for _, compiled in triggered]
+
+        return self._merge_updates(triggered, updates, signature)
+
+    async def aafter_model(
+        self, state: SubAgentState, runtime: Runtime[ContextT]
+    ) -> dict[str, Any] | None:
+        """after_model 的异步版本（astream / ainvoke 时使用）.
+
+        子 Agent 通过 runner.ainvoke_reactive 并发调用（asyncio.gather），
+        等待 LLM 期间不阻塞事件循环。
         """
         reactive_list = self._reactive_by_hook.get("after_model")
-        if not reactive_list:
+        if not reactive_list or not state.get("messages"):
+            return None
+
+        triggered, signature = self._triggered(reactive_list, state)
+        if not triggered:
             return None
 
+        # 调用子 Agent（ainvoke_reactive 内部已做错误隔离，不会抛异常）
+        updates = await asyncio.gather(
+            *(self._runner.ainvoke_reactive(compiled, state) for _, compiled in triggered)
+        )
+
+        return self._merge_updates(triggered, updates, signature)
+
+    def _merge_updates(
+        self,
+        triggered: list[tuple[str, CompiledSubAgent]],
+        updates: list[dict[str, Any]],
+        signature: tuple[Any, ...] | None,
+    ) -> dict[str, Any] | None:
+        """按注册顺序合并各子 Agent 的 state 更新，并记录产生更新的触发签名."""
         merged_updates: dict[str, Any] = {}
+        for (name, _), update in zip(triggered, updates):
+            if update:
+                merged_updates.update(update)
+                if signature is not None:
+                    self._last_signatures[name] = signature
+
+        return merged_updates if merged_updates else None
 
+    def _triggered(
+        self,
+        reactive_list: list[tuple[ReactiveSubAgentConfig, CompiledSubAgent]],
+        state: SubAgentState,
+    ) -> tuple[list[tuple[str, CompiledSubAgent]], tuple[Any, ...] | None]:
+        """筛选本轮应触发的 reactive 子 Agent，返回 ((name, compiled) 列表, 触发签名).
+
+        1. 检查 trigger_condition（如果定义），异常时跳过该子 Agent
+        2. 触发签名与上次更新时相同则跳过
+
+        触发签名在整个 hook 内只计算一次，且仅在至少一个子 Agent 通过触发条件时计算。
+        """
+        candidates: list[tuple[str, CompiledSubAgent]] = []
         for cfg, compiled in reactive_list:
+            name = cfg["name"]
+
             # 检查触发条件
             condition = cfg.get("trigger_condition")
             if condition is not None:
@@ -136,17 +248,40 @@ class SubAgentMiddleware(AgentMiddleware[SubAgentState, ContextT]):
                     if not condition(state):
                         continue
                 except Exception as e:
-                    logger.warning(
-                        f"SubAgent '{cfg['name']}': trigger_condition 异常: {e}"
-                    )
+                    logger.warning(f"SubAgent '{name}': trigger_condition 异常: {e}")
                     continue
 
-            # 调用子 Agent
-            update = self._runner.invoke_reactive(compiled, state)
-            if update:
-                merged_updates.update(update)
+            candidates.append((name, compiled))
 
-        return merged_updates if merged_updates else None
+        if not candidates:
+            return [], None
+
+        signature = self._trigger_signature(state)
+        if signature is None:
+            return candidates, None
+
+        triggered: list[tuple[str, CompiledSubAgent]] = []
+        for name, compiled in candidates:
+            if self._last_signatures.get(name) == signature:
+                logger.debug(f"SubAgent '{name}': 触发签名未变化，跳过")
+                continue
+            triggered.append((name, compiled))
+        return triggered, signature
+
+    @staticmethod
+    def _trigger_signature(state: SubAgentState) -> tuple[Any, ...] | None:
+        """由会话 thread_id、最后一条消息 id 与当前步骤状态组成触发签名.
+
+        middleware 实例由所有会话共享，且不同会话可能出现相同的消息 id
+        （如 LLM 响应缓存命中时回放的消息），因此签名必须包含 thread_id。
+        消息 id 缺失时无法判断是否为同一轮，返回 None（不跳过）。
+        """
+        messages = state.get("messages") or []
+        last_id = getattr(messages[-1], "id", None) if messages else None
+        if last_id is None:
+            return None
+        todos = state.get("todos") or []
+        return _current_thread_id(), last_id, tuple(t.get("status") for t in todos)
 
     # ------------------------------------------------------------------
     # 内部: 构建 task() tool
@@ -165,18 +300,18 @@ class SubAgentMiddleware(AgentMiddleware[SubAgentState, ContextT]):
             for name, compiled in self._delegated.items()
         )
 
-        # 闭包捕获
+        # 闭包捕获（委派式子 Agent 在 __init__ 后不再变化，可用名称列表预先拼接）
         delegated_map = self._delegated
         runner = self._runner
+        available = ", ".join(delegated_map)
 
         @tool
         def task(agent_name: str, task_description: str) -> str:
             """将任务委派给专业子Agent执行。子Agent拥有独立上下文，不会污染当前对话。"""
-            if agent_name not in delegated_map:
-                available = ", ".join(delegated_map.keys())
+            compiled = delegated_map.get(agent_name)
+            if compiled is None:
                 return f"未知的子Agent '{agent_name}'。可用: {available}"
 
-            compiled = delegated_map[agent_name]
             return runner.invoke_delegated(compiled, task_description)
 
         # 动态更新 description，包含可用子 Agent 列表
@@ -189,3 +324,70 @@ class SubAgentMiddleware(AgentMiddleware[SubAgentState, ContextT]):
         )
 
         return task
+
+    def _build_batch_task_tool(self, max_concurrency: int) -> BaseTool:
+        """构建 batch_task(invocations) 工具.
+
+        主 LLM 一次提交多个互不依赖的委派任务，子 Agent 并发执行（最多
+        max_concurrency 个同时在途），结果按提交顺序以 JSON 数组返回。
+        同步调用走线程池，异步调用走 asyncio.gather + Semaphore。
+        """
+        delegated_map = self._delegated
+        runner = self._runner
+        available = ", ".join(delegated_map)
+
+        def unknown(agent_name: str) -> str:
+            return f"未知的子Agent '{agent_name}'。可用: {available}"
+
+        def run_one(invocation: TaskInvocation) -> str:
+            compiled = delegated_map.get(invocation["agent_name"])
+            if compiled is None:
+                return unknown(invocation["agent_name"])
+            return runner.invoke_delegated(compiled, invocation["task_description"])
+
+        def format_results(invocations: list[TaskInvocation], results: list[str]) -> str:
+            return orjson.dumps(
+                [
+                    {"agent_name": inv["agent_name"], "result": result}
+                    for inv, result in zip(invocations, results)
+                ]
+            ).decode()
+
+        def batch_task(invocations: list[TaskInvocation]) -> str:
+            if not invocations:
+                return "[]"
+            workers = min(max_concurrency, len(invocations))
+            with ContextThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(run_one, invocations))
+            return format_results(invocations, results)
+
+        async def abatch_task(invocations: list[TaskInvocation]) -> str:
+            if not invocations:
+                return "[]"
+            semaphore = asyncio.Semaphore(max_concurrency)
+
+            async def arun_one(invocation: TaskInvocation) -> str:
+                compiled = delegated_map.get(invocation["agent_name"])
+                if compiled is None:
+                    return unknown(invocation["agent_name"])
+                async with semaphore:
+                    return await runner.ainvoke_delegated(
+                        compiled, invocation["task_description"]
+                    )
+
+            results = await asyncio.gather(*(arun_one(inv) for inv in invocations))
+            return format_results(invocations, list(results))
+
+        return StructuredTool.from_function(
+            func=batch_task,
+            coroutine=abatch_task,
+            name="batch_task",
+            description=(
+                "并发委派多个互不依赖的任务给子Agent执行，一次调用返回全部结果（JSON 数组，顺序与提交一致）。"
+                "任务之间有先后依赖时请改用 task 逐个调用。\n\n"
+                f"可用的子Agent: {available}\n\n"
+                "参数说明：\n"
+                "- invocations: 任务列表，每项包含 agent_name（子Agent名称）"
+                "与 task_description（详细的任务描述，包含所有必要上下文）"
+            ),
+        )
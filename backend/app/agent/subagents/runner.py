@@ -7,7 +7,13 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import hashlib
 import logging
+import threading
+import time
+from collections import OrderedDict
 from typing import Any
 
 from langchain.agents import create_agent
@@ -23,18 +29,35 @@ from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Simple 模式输出缓存：同一子 Agent 在 TTL 内收到完全相同的上下文时，
+# 直接复用上次 LLM 输出，省去一次完整的网络往返与解码
+RESPONSE_CACHE_SIZE = 128
+RESPONSE_CACHE_TTL = 60.0  # 秒
+
+
+@functools.lru_cache(maxsize=64)
+def _prompt_cache_key(prompt: str) -> str:
+    """系统提示词内容的摘要，作为提供方前缀缓存的路由 key（与主 Agent 的做法一致）."""
+    return hashlib.sha1(prompt.encode("utf-8")).hexdigest()
+
 
 class SubAgentRunner:
     """子 Agent 编译与调用引擎.
 
     - compile(): 将配置编译为 CompiledSubAgent（缓存）
-    - invoke_delegated(): 委派模式调用（状态隔离，返回文本）
+    - invoke_delegated() / ainvoke_delegated(): 委派模式调用（状态隔离，返回文本）
     - invoke_reactive(): 响应模式调用（不抛异常，返回 state 更新）
     """
 
     def __init__(self) -> None:
         self._compiled: dict[str, CompiledSubAgent] = {}
         self._llm_cache: dict[str, ChatOpenAI] = {}
+        # key -> (写入时间 monotonic, LLM 输出文本)，按最近使用排序
+        self._response_cache: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._response_cache_lock = threading.Lock()
+        # key -> 进行中的 Simple 模式异步调用（仅在所属事件循环内共享）。
+        # 各 SSE 端点经 agent.astream 走 aafter_model → ainvoke_reactive，并发会话在此合并
+        self._inflight: dict[str, asyncio.Future[str]] = {}
 
     # ------------------------------------------------------------------
     # 编译
@@ -116,6 +139,27 @@ class SubAgentRunner:
             )
             return f"子 Agent 执行出错: {e}"
 
+    async def ainvoke_delegated(
+        self,
+        compiled: CompiledSubAgent,
+        task_description: str,
+    ) -> str:
+        """invoke_delegated 的异步版本（agent.ainvoke），供并发委派使用."""
+        if compiled.runnable is None:
+            return f"子 Agent '{compiled.name}' 未编译为 Full Agent 模式，无法委派调用。"
+
+        try:
+            result = await compiled.runnable.ainvoke(
+                {"messages": [HumanMessage(content=task_description)]}
+            )
+            return self._extract_last_ai_content(result)
+        except Exception as e:
+            logger.error(
+                f"SubAgentRunner: 委派子 Agent '{compiled.name}' 失败: {e}",
+                exc_info=True,
+            )
+            return f"子 Agent 执行出错: {e}"
+
     # ------------------------------------------------------------------
     # 响应模式调用
     # ------------------------------------------------------------------
@@ -132,49 +176,98 @@ class SubAgentRunner:
            Full Agent 模式: agent.invoke()
         3. result_parser 解析输出为 state 更新
         """
-        config = compiled.config
+        context_messages, early_result = self._build_reactive_context(
+            compiled, parent_state
+        )
+        if context_messages is None:
+            return early_result
+
+        # Step 2: 调用子 Agent
+        try:
+            if compiled.is_simple_mode:
+                raw_output = self._invoke_simple(compiled, context_messages)
+            else:
+                raw_output = self._invoke_full(compiled, context_messages)
+        except Exception as e:
+            logger.warning(f"SubAgent '{compiled.name}': 调用失败: {e}", exc_info=True)
+            return compiled.fallback_on_error
+
+        return self._parse_reactive_output(compiled, raw_output)
+
+    async def ainvoke_reactive(
+        self,
+        compiled: CompiledSubAgent,
+        parent_state: dict[str, Any],
+    ) -> dict[str, Any]:
+        """invoke_reactive 的异步版本: 子 Agent 调用走 ainvoke，等待 LLM 时不阻塞事件循环.
+
+        context_builder / result_parser 均为轻量的纯 CPU 函数，仍同步执行。
+        """
+        context_messages, early_result = self._build_reactive_context(
+            compiled, parent_state
+        )
+        if context_messages is None:
+            return early_result
+
+        # Step 2: 调用子 Agent
+        try:
+            if compiled.is_simple_mode:
+                raw_output = await self._ainvoke_simple(compiled, context_messages)
+            else:
+                raw_output = await self._ainvoke_full(compiled, context_messages)
+        except Exception as e:
+            logger.warning(f"SubAgent '{compiled.name}': 调用失败: {e}", exc_info=True)
+            return compiled.fallback_on_error
+
+        return self._parse_reactive_output(compiled, raw_output)
+
+    @staticmethod
+    def _build_reactive_context(
+        compiled: CompiledSubAgent,
+        parent_state: dict[str, Any],
+    ) -> tuple[list | None, dict[str, Any] | None]:
+        """Step 1: 调用 context_builder 提取上下文.
+
+        Returns:
+            tuple of (上下文消息, 上下文为 None 时应直接返回的结果)；
+            成功取得上下文时第二项为 None，正常路径不分配空 dict
+        """
         name = compiled.name
-        fallback: dict[str, Any] = config.get("fallback_on_error", {})
 
-        # Step 1: 提取上下文
-        context_builder = config.get("context_builder")
+        context_builder = compiled.context_builder
         if context_builder is None:
             logger.warning(f"SubAgent '{name}': 缺少 context_builder")
-            return fallback
+            return None, compiled.fallback_on_error
 
         try:
             context_messages = context_builder(parent_state)
         except Exception as e:
             logger.warning(f"SubAgent '{name}': context_builder 异常: {e}")
-            return fallback
+            return None, compiled.fallback_on_error
 
         if not context_messages:
-            return {}
+            return None, {}
 
-        # Step 2: 调用子 Agent
-        try:
-            if compiled.is_simple_mode:
-                raw_output = self._invoke_simple(compiled, context_messages)
-            else:
-                raw_output = self._invoke_full(compiled, context_messages)
-        except Exception as e:
-            logger.warning(f"SubAgent '{name}': 调用失败: {e}", exc_info=True)
-            return fallback
+        return context_messages, None
 
-        # Step 3: 解析结果
-        result_parser = config.get("result_parser")
+    @staticmethod
+    def _parse_reactive_output(
+        compiled: CompiledSubAgent,
+        raw_output: Any,
+    ) -> dict[str, Any]:
+        """Step 3: result_parser 解析子 Agent 输出为 state 更新."""
+        result_parser = compiled.result_parser
         if result_parser:
             try:
                 parsed = result_parser(raw_output)
                 return parsed if isinstance(parsed, dict) else {}
             except Exception as e:
-                logger.warning(f"SubAgent '{name}': result_parser 异常: {e}")
-                return fallback
+                logger.warning(f"SubAgent '{compiled.name}': result_parser 异常: {e}")
+                return compiled.fallback_on_error
 
         # 无 parser 时：Full Agent 模式下尝试提取 owned keys
         if isinstance(raw_output, dict):
-            owned_keys = config.get("owned_state_keys", [])
-            return {k: raw_output[k] for k in owned_keys if k in raw_output}
+            return {k: raw_output[k] for k in compiled.owned_state_keys if k in raw_output}
 
         return {}
 
@@ -189,13 +282,75 @@ class SubAgentRunner:
     ) -> str:
         """Simple 模式: 直接 LLM 调用.
 
+        相同子 Agent + 相同上下文在 RESPONSE_CACHE_TTL 内命中缓存时跳过 LLM 调用。
+
         Returns:
             LLM 输出的文本内容
         """
-        system_msg = {"role": "system", "content": compiled.config["system_prompt"]}
-        response = compiled.llm.invoke([system_msg] + context_messages)
-        content = response.content if hasattr(response, "content") else str(response)
-        return content if isinstance(content, str) else str(content)
+        key = self._response_cache_key(compiled, context_messages)
+        cached = self._get_cached_response(key)
+        if cached is not None:
+            logger.debug(f"SubAgent '{compiled.name}': 命中输出缓存，跳过 LLM 调用")
+            return cached
+
+        response = compiled.llm.invoke(
+            self._simple_messages(compiled, context_messages),
+            **self._simple_invoke_kwargs(compiled),
+        )
+        content = self._response_text(response)
+
+        self._put_cached_response(key, content)
+        return content
+
+    async def _ainvoke_simple(
+        self,
+        compiled: CompiledSubAgent,
+        context_messages: list,
+    ) -> str:
+        """Simple 模式异步调用（llm.ainvoke），与 _invoke_simple 共用输出缓存.
+
+        并发会话在同一时刻提交相同上下文时合并为一次 LLM 调用：
+        后到的请求直接等待进行中的调用结果（缓存只能在调用完成后命中）。
+        """
+        key = self._response_cache_key(compiled, context_messages)
+        cached = self._get_cached_response(key)
+        if cached is not None:
+            logger.debug(f"SubAgent '{compiled.name}': 命中输出缓存，跳过 LLM 调用")
+            return cached
+
+        loop = asyncio.get_running_loop()
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight.get_loop() is loop:
+            logger.debug(f"SubAgent '{compiled.name}': 合并到进行中的相同调用")
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # 仅当发起方的调用被取消时自行重试；自身被取消则继续向上传播
+                if not inflight.cancelled():
+                    raise
+
+        future: asyncio.Future[str] = loop.create_future()
+        self._inflight[key] = future
+        try:
+            response = await compiled.llm.ainvoke(
+                self._simple_messages(compiled, context_messages),
+                **self._simple_invoke_kwargs(compiled),
+            )
+            content = self._response_text(response)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # 标记异常已取回，无等待方时不产生 "never retrieved" 警告
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+        future.set_result(content)
+        self._put_cached_response(key, content)
+        return content
 
     def _invoke_full(
         self,
@@ -209,6 +364,69 @@ class SubAgentRunner:
         """
         return compiled.runnable.invoke({"messages": context_messages})
 
+    async def _ainvoke_full(
+        self,
+        compiled: CompiledSubAgent,
+        context_messages: list,
+    ) -> dict[str, Any]:
+        """Full Agent 模式异步调用（agent.ainvoke）."""
+        return await compiled.runnable.ainvoke({"messages": context_messages})
+
+    @staticmethod
+    def _simple_messages(compiled: CompiledSubAgent, context_messages: list) -> list:
+        """Simple 模式的 LLM 输入: system prompt + 上下文消息."""
+        return [compiled.system_message, *context_messages]
+
+    @staticmethod
+    def _simple_invoke_kwargs(compiled: CompiledSubAgent) -> dict[str, Any]:
+        """Simple 模式的调用参数.
+
+        开启 llm_prompt_cache 时携带 prompt_cache_key：子 Agent 每轮的系统提示词都相同，
+        同一提示词的请求路由到同一缓存前缀，提供方可直接复用前缀的 KV 缓存。
+        """
+        if not settings.llm_prompt_cache:
+            return {}
+        key = _prompt_cache_key(compiled.config["system_prompt"])
+        return {"extra_body": {"prompt_cache_key": key}}
+
+    @staticmethod
+    def _response_text(response: Any) -> str:
+        """提取 LLM 响应的文本内容."""
+        content = response.content if hasattr(response, "content") else str(response)
+        return content if isinstance(content, str) else str(content)
+
+    @staticmethod
+    def _response_cache_key(compiled: CompiledSubAgent, context_messages: list) -> str:
+        """由子 Agent 名称与上下文消息（类型 + 内容）计算缓存 key."""
+        digest = hashlib.blake2b(compiled.name.encode("utf-8"), digest_size=16)
+        for msg in context_messages:
+            digest.update(b"\x00")
+            digest.update(str(getattr(msg, "type", "")).encode("utf-8"))
+            digest.update(b"\x00")
+            digest.update(str(getattr(msg, "content", msg)).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _get_cached_response(self, key: str) -> str | None:
+        """读取未过期的缓存输出，并将其标记为最近使用."""
+        with self._response_cache_lock:
+            entry = self._response_cache.get(key)
+            if entry is None:
+                return None
+            stored_at, content = entry
+            if time.monotonic() - stored_at > RESPONSE_CACHE_TTL:
+                del self._response_cache[key]
+                return None
+            self._response_cache.move_to_end(key)
+            return content
+
+    def _put_cached_response(self, key: str, content: str) -> None:
+        """写入缓存，超出 RESPONSE_CACHE_SIZE 时淘汰最久未使用的条目."""
+        with self._response_cache_lock:
+            self._response_cache[key] = (time.monotonic(), content)
+            self._response_cache.move_to_end(key)
+            while len(self._response_cache) > RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
+
     def _get_or_create_llm(self, model: str | None = None) -> ChatOpenAI:
         """获取或创建 LLM 实例（按 model 标识缓存）."""
         model_id = model or settings.subagent_model or settings.llm_model
@@ -225,9 +443,9 @@ class SubAgentRunner:
     @staticmethod
     def _extract_last_ai_content(result: dict[str, Any]) -> str:
         """从 agent invoke 结果中提取最后一条 AIMessage 内容."""
-        messages = result.get("messages", [])
-        for msg in reversed(messages):
-            if isinstance(msg, AIMessage):
-                content = msg.content
-                return content if isinstance(content, str) else str(content)
-        return "子 Agent 执行完成但未产生回复。"
+        messages = result.get("messages") or ()
+        last_ai = next((m for m in reversed(messages) if isinstance(m, AIMessage)), None)
+        if last_ai is None:
+            return "子 Agent 执行完成但未产生回复。"
+        content = last_ai.content
+        return content if isinstance(content, str) else str(content)
@@ -12,7 +12,7 @@ from typing import Any, Callable, Literal, Sequence, Union
 from typing_extensions import NotRequired, TypedDict
 
 from langchain.agents.middleware import AgentMiddleware
-from langchain_core.messages import BaseMessage
+from langchain_core.messages import BaseMessage, SystemMessage
 from langchain_core.tools import BaseTool
 
 
@@ -141,7 +141,7 @@ class ReactiveSubAgentConfig(TypedDict):
 # CompiledSubAgent — 编译后的子 Agent（内部实现）
 # ---------------------------------------------------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class CompiledSubAgent:
     """编译后的子 Agent 实例.
 
@@ -158,6 +158,22 @@ class CompiledSubAgent:
     llm: Any = field(default=None, repr=False)
     """Simple 模式: ChatOpenAI 实例"""
 
+    # ---- 由 config 预先提取（响应式调用的热路径直接读取属性，不再逐次查 dict）----
+    context_builder: ContextBuilder | None = field(init=False, repr=False)
+    result_parser: ResultParser | None = field(init=False, repr=False)
+    owned_state_keys: tuple[str, ...] = field(init=False, repr=False)
+    fallback_on_error: dict[str, Any] = field(init=False, repr=False)
+    system_message: SystemMessage = field(init=False, repr=False)
+    """Simple 模式的系统消息。系统提示词是常量，每次调用复用同一对象，视为只读。"""
+
+    def __post_init__(self) -> None:
+        config = self.config
+        self.system_message = SystemMessage(content=config["system_prompt"])
+        self.context_builder = config.get("context_builder")
+        self.result_parser = config.get("result_parser")
+        self.owned_state_keys = tuple(config.get("owned_state_keys", ()))
+        self.fallback_on_error = config.get("fallback_on_error", {})
+
     @property
     def is_simple_mode(self) -> bool:
         """是否为 Simple 模式（无 tools，直接 LLM 调用）"""
@@ -3,11 +3,20 @@
 from __future__ import annotations
 
 from langchain.tools import tool
+from langchain_core.documents import Document
 
 from app.agent.tools.registry import tool_registry
 from app.knowledge.vector_store import knowledge_manager
 
 
+def _format_docs(docs: list[Document], label: str) -> str:
+    # str.join materialises its input anyway; a list comprehension skips the generator frames
+    return "\n\n".join([
+        f"{label}: {doc.metadata.get('source', 'N/A')}\n内容: {doc.page_content}"
+        for doc in docs
+    ])
+
+
 @tool(response_format="content_and_artifact")
 def search_terminology(query: str):
     """当遇到专业术语或需要查询术语定义时，使用此工具检索专业术语表。
@@ -18,11 +27,7 @@ def search_terminology(query: str):
     docs = knowledge_manager.search_terminology(query, k=3)
     if not docs:
         return "未找到相关术语。", []
-    serialized = "\n\n".join(
-        f"术语来源: {doc.metadata.get('source', 'N/A')}\n内容: {doc.page_content}"
-        for doc in docs
-    )
-    return serialized, docs
+    return _format_docs(docs, "术语来源"), docs
 
 
 @tool(response_format="content_and_artifact")
@@ -35,11 +40,7 @@ def search_design_doc(query: str):
     docs = knowledge_manager.search_design_docs(query, k=3)
     if not docs:
         return "未找到相关设计文档。", []
-    serialized = "\n\n".join(
-        f"文档来源: {doc.metadata.get('source', 'N/A')}\n内容: {doc.page_content}"
-        for doc in docs
-    )
-    return serialized, docs
+    return _format_docs(docs, "文档来源"), docs
 
 
 def register_knowledge_tools() -> None:
@@ -20,8 +20,14 @@ class ToolRegistry:
     def __init__(self) -> None:
         self._tools: dict[str, BaseTool] = {}
         self._categories: dict[str, list[str]] = {}
+        self._name_to_category: dict[str, str] = {}
         self._hitl_required: set[str] = set()
         self._param_edit_schemas: dict[str, dict[str, "ParamSchema"]] = {}
+        self._data_table_emitters: set[str] = set()
+        self._all_tools_cache: tuple[BaseTool, ...] | None = None
+        self._definitions_cache: list[dict[str, Any]] | None = None
+        # args_schema class -> JSON schema; schema classes are immutable once defined
+        self._json_schema_cache: dict[type, dict[str, Any]] = {}
 
     # ---- registration ----
 
@@ -32,6 +38,7 @@ class ToolRegistry:
         category: str = "query",
         requires_hitl: bool = False,
         param_edit_schema: dict[str, "ParamSchema"] | None = None,
+        emits_data_table: bool = False,
     ) -> None:
         """Register a tool with optional metadata.
 
@@ -43,12 +50,19 @@ class ToolRegistry:
                 Maps parameter names to ParamSchema definitions.
                 If provided, the MissingParamsMiddleware will use this
                 to generate UI forms for missing parameters.
+            emits_data_table: Whether tool results may contain [DATA_TABLE]
+                blocks. Only these tools are inspected by DataTableMiddleware.
         """
         name = tool.name
         self._tools[name] = tool
+        self._all_tools_cache = None
+        self._definitions_cache = None
         self._categories.setdefault(category, []).append(name)
+        self._name_to_category[name] = category
         if requires_hitl:
             self._hitl_required.add(name)
+        if emits_data_table:
+            self._data_table_emitters.add(name)
         # Auto-detect from @param_edit decorator if not passed explicitly
         schema = param_edit_schema or getattr(tool, "_param_edit_schema", None)
         if schema:
@@ -56,8 +70,11 @@ class ToolRegistry:
 
     # ---- queries ----
 
-    def get_all_tools(self) -> list[BaseTool]:
-        return list(self._tools.values())
+    def get_all_tools(self) -> tuple[BaseTool, ...]:
+        """Return all registered tools as an immutable tuple (cached until next register)."""
+        if self._all_tools_cache is None:
+            self._all_tools_cache = tuple(self._tools.values())
+        return self._all_tools_cache
 
     def get_tool(self, name: str) -> BaseTool | None:
         return self._tools.get(name)
@@ -74,24 +91,28 @@ class ToolRegistry:
         """Return tools_with_param_edit config for MissingParamsMiddleware."""
         return self._param_edit_schemas.copy()
 
+    def get_data_table_tools(self) -> frozenset[str]:
+        """Return names of tools whose results may contain [DATA_TABLE] blocks."""
+        return frozenset(self._data_table_emitters)
+
     def get_tool_definitions(self) -> list[dict[str, Any]]:
-        """Return serialisable definitions for the GET /api/tools endpoint."""
+        """Return serialisable definitions for the GET /api/tools endpoint.
+
+        The registry is fixed after startup, so the list is built once and
+        reused until the next register(); callers must not mutate it.
+        """
+        if self._definitions_cache is None:
+            self._definitions_cache = self._build_tool_definitions()
+        return self._definitions_cache
+
+    def _build_tool_definitions(self) -> list[dict[str, Any]]:
         defs: list[dict[str, Any]] = []
-        # Build reverse category lookup
-        name_to_cat: dict[str, str] = {}
-        for cat, names in self._categories.items():
-            for n in names:
-                name_to_cat[n] = cat
         for name, tool in self._tools.items():
             tool_def: dict[str, Any] = {
                 "name": name,
                 "description": tool.description,
-                "parameters_schema": (
-                    tool.args_schema.model_json_schema()
-                    if tool.args_schema
-                    else {}
-                ),
-                "category": name_to_cat.get(name, "query"),
+                "parameters_schema": self._json_schema(tool.args_schema),
+                "category": self._name_to_category.get(name, "query"),
                 "requires_hitl": name in self._hitl_required,
             }
             # Include param edit schema if defined
@@ -103,6 +124,14 @@ class ToolRegistry:
             defs.append(tool_def)
         return defs
 
+    def _json_schema(self, args_schema: Any) -> dict[str, Any]:
+        if not args_schema:
+            return {}
+        schema = self._json_schema_cache.get(args_schema)
+        if schema is None:
+            schema = self._json_schema_cache[args_schema] = args_schema.model_json_schema()
+        return schema
+
 
 # Singleton
 tool_registry = ToolRegistry()
@@ -387,5 +387,9 @@ def query_simulation_results(
 def register_telecom_tools() -> None:
     """Register all telecom tools into the global registry."""
     tool_registry.register(match_scenario, category="query")
-    tool_registry.register(query_root_cause_analysis, category="query")
-    tool_registry.register(query_simulation_results, category="query")
+    tool_registry.register(
+        query_root_cause_analysis, category="query", emits_data_table=True
+    )
+    tool_registry.register(
+        query_simulation_results, category="query", emits_data_table=True
+    )
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import json
 import uuid
 
 from fastapi import APIRouter
@@ -35,7 +36,7 @@ async def chat(request: ChatRequest):
 
     config = {"configurable": {"thread_id": conversation_id}}
 
-    stream = agent.stream(
+    stream = agent.astream(
         {"messages": [{"role": "user", "content": request.message}]},
         config=config,
         stream_mode="updates",
@@ -43,7 +44,6 @@ async def chat(request: ChatRequest):
 
     async def generate():
         # Emit conversation_id as first event
-        import json
         yield f"event: session\ndata: {json.dumps({'conversation_id': conversation_id})}\n\n"
 
         async for sse_frame in map_agent_stream_to_sse(stream, conversation_id):
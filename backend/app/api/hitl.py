@@ -45,7 +45,7 @@ async def hitl_decide(execution_id: str, decision: HITLDecision):
 
     # Resume the agent with the human decision using stream mode
     config = {"configurable": {"thread_id": execution_id}}
-    stream = agent.stream(
+    stream = agent.astream(
         Command(resume={"decisions": decisions}),
         config=config,
         stream_mode="updates",
@@ -39,7 +39,7 @@ async def params_decide(execution_id: str, decision: ParamsDecision):
     from langgraph.types import Command
 
     config = {"configurable": {"thread_id": execution_id}}
-    stream = agent.stream(
+    stream = agent.astream(
         Command(resume=resume_value),
         config=config,
         stream_mode="updates",
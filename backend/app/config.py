@@ -16,9 +16,12 @@ class Settings(BaseSettings):
     llm_model: str = "openai:gpt-4o"
     llm_api_key: str = ""
     llm_base_url: str = ""
+    llm_prompt_cache: bool = True  # 请求中携带 prompt_cache_key，触发提供方前缀缓存
+    llm_response_cache_size: int = 0  # 主 Agent LLM 精确匹配响应缓存条数，0 表示关闭（默认）
 
     # SubAgent
     subagent_model: str = ""  # 子 Agent 模型标识符，空则复用 llm_model
+    subagent_max_concurrency: int = 4  # batch_task 并发委派上限，0 表示不提供 batch_task
 
     # Paths
     knowledge_dir: str = str(Path(__file__).resolve().parent.parent.parent / "knowledge")
@@ -2,7 +2,10 @@
 
 from __future__ import annotations
 
+import json
 import logging
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
 from langchain_community.vectorstores import FAISS
@@ -14,6 +17,13 @@ from app.knowledge.loader import load_markdown_directory
 
 logger = logging.getLogger(__name__)
 
+# Persisted next to each FAISS index: fingerprint of the source docs it was built from
+MANIFEST_FILE = "source_manifest.json"
+
+# Recent (store, query, k) search results kept per process; agents often repeat
+# a lookup within a session, and a hit skips embedding + FAISS search entirely
+SEARCH_CACHE_SIZE = 512
+
 
 def _get_embeddings() -> Embeddings:
     """Return the configured embedding model.
@@ -37,6 +47,34 @@ def _get_embeddings() -> Embeddings:
     return FakeEmbeddings(size=384)
 
 
+def _source_manifest(doc_dir: str) -> dict[str, list[int]]:
+    """Fingerprint the .md files in *doc_dir* as {name: [mtime_ns, size]}.
+
+    Only stat() calls — no file contents are read — so comparing it against
+    the manifest saved with an index is cheap enough to run on every startup.
+    """
+    dir_path = Path(doc_dir)
+    if not dir_path.exists():
+        return {}
+    manifest: dict[str, list[int]] = {}
+    for md_file in dir_path.glob("*.md"):
+        stat = md_file.stat()
+        manifest[md_file.name] = [stat.st_mtime_ns, stat.st_size]
+    return manifest
+
+
+def _read_manifest(index_path: Path) -> dict[str, list[int]] | None:
+    try:
+        return json.loads((index_path / MANIFEST_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _save_index(store: FAISS, index_path: Path, manifest: dict[str, list[int]]) -> None:
+    store.save_local(str(index_path))
+    (index_path / MANIFEST_FILE).write_text(json.dumps(manifest), encoding="utf-8")
+
+
 class KnowledgeManager:
     """Manages two independent FAISS vector stores:
     - terminology_store  (专业术语表)
@@ -47,6 +85,8 @@ class KnowledgeManager:
         self.embeddings: Embeddings | None = None
         self.terminology_store: FAISS | None = None
         self.design_doc_store: FAISS | None = None
+        self._search_cache: OrderedDict[tuple[str, str, int], list[Document]] = OrderedDict()
+        self._search_cache_lock = threading.Lock()
 
     def initialize(self) -> None:
         """Build / load FAISS indexes on application startup."""
@@ -62,13 +102,19 @@ class KnowledgeManager:
             store_name="design_docs",
             doc_dir=settings.design_docs_dir,
         )
+        self._clear_search_cache()
 
     def _load_or_build(self, store_name: str, doc_dir: str) -> FAISS | None:
         index_path = Path(settings.faiss_index_dir) / store_name
         assert self.embeddings is not None
-
-        # Try loading persisted index
-        if index_path.exists():
+        manifest = _source_manifest(doc_dir)
+
+        # Try loading persisted index; rebuild when source docs changed since it was saved.
+        # A missing source dir can't be rebuilt from, so keep whatever index was persisted.
+        stale = Path(doc_dir).exists() and _read_manifest(index_path) != manifest
+        if index_path.exists() and stale:
+            logger.info("Source documents changed for %s, rebuilding index", store_name)
+        elif index_path.exists():
             try:
                 store = FAISS.load_local(
                     str(index_path),
@@ -87,7 +133,7 @@ class KnowledgeManager:
             return None
 
         store = FAISS.from_documents(docs, self.embeddings)
-        store.save_local(str(index_path))
+        _save_index(store, index_path, manifest)
         logger.info("Built FAISS index: %s (%d chunks)", store_name, len(docs))
         return store
 
@@ -103,27 +149,51 @@ class KnowledgeManager:
             targets.append(("design_docs", settings.design_docs_dir, "design_doc_store"))
 
         for store_name, doc_dir, attr in targets:
+            manifest = _source_manifest(doc_dir)
             docs = load_markdown_directory(doc_dir)
             if docs:
                 store = FAISS.from_documents(docs, self.embeddings)
                 index_path = Path(settings.faiss_index_dir) / store_name
-                store.save_local(str(index_path))
+                _save_index(store, index_path, manifest)
                 setattr(self, attr, store)
                 counts[store_name] = len(docs)
             else:
                 counts[store_name] = 0
 
+        self._clear_search_cache()
         return counts
 
     def search_terminology(self, query: str, k: int = 3) -> list[Document]:
-        if self.terminology_store is None:
-            return []
-        return self.terminology_store.similarity_search(query, k=k)
+        return self._search("terminology", self.terminology_store, query, k)
 
     def search_design_docs(self, query: str, k: int = 3) -> list[Document]:
-        if self.design_doc_store is None:
+        return self._search("design_docs", self.design_doc_store, query, k)
+
+    def _search(
+        self, store_name: str, store: FAISS | None, query: str, k: int
+    ) -> list[Document]:
+        """similarity_search behind a bounded LRU keyed on (store, stripped query, k)."""
+        if store is None:
             return []
-        return self.design_doc_store.similarity_search(query, k=k)
+        query = query.strip()
+        key = (store_name, query, k)
+        with self._search_cache_lock:
+            docs = self._search_cache.get(key)
+            if docs is not None:
+                self._search_cache.move_to_end(key)
+                return list(docs)
+
+        docs = store.similarity_search(query, k=k)
+        with self._search_cache_lock:
+            self._search_cache[key] = docs
+            if len(self._search_cache) > SEARCH_CACHE_SIZE:
+                self._search_cache.popitem(last=False)
+        return list(docs)
+
+    def _clear_search_cache(self) -> None:
+        """Drop cached results; called whenever the stores are (re)built."""
+        with self._search_cache_lock:
+            self._search_cache.clear()
 
 
 # Singleton
@@ -1,30 +1,40 @@
-"""Map agent.stream() output to structured SSE events."""
+"""Map agent.astream() output to structured SSE events."""
 
 from __future__ import annotations
 
-import json
 import uuid
+from dataclasses import asdict, is_dataclass
 from typing import Any, AsyncIterator
 
+import orjson
 from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
 
 
 def _sse(event_type: str, data: dict[str, Any]) -> str:
-    """Format a single SSE frame."""
-    payload = json.dumps(data, ensure_ascii=False)
+    """Format a single SSE frame.
+
+    orjson emits compact UTF-8 (equivalent to ensure_ascii=False) and is several
+    times faster than stdlib json on the large table.data payloads.
+    """
+    payload = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
     return f"event: {event_type}\ndata: {payload}\n\n"
 
 
 async def map_agent_stream_to_sse(
-    stream,
+    stream: AsyncIterator[dict[str, Any]],
     thread_id: str,
 ) -> AsyncIterator[str]:
-    """Consume an agent stream and yield SSE-formatted strings.
+    """Consume an agent.astream() stream and yield SSE-formatted strings.
+
+    The stream is iterated asynchronously so the event loop is never blocked
+    while the agent waits on the LLM, and middleware with native async hooks
+    (e.g. SubAgentMiddleware.aafter_model) run on their async path.
 
     Event types emitted:
       - thinking       : LLM token-level output
       - tool.call      : Agent decided to call a tool
       - tool.result    : Tool returned a result
+      - table.data     : Full DATA_TABLE data for the tool results of one update
       - todo.state     : TODO list state updated
       - hitl.pending   : Human-in-the-Loop approval required
       - params.pending : Missing parameters need user input (from MissingParamsMiddleware)
@@ -34,7 +44,7 @@ async def map_agent_stream_to_sse(
     """
 
     try:
-        for event in stream:
+        async for event in stream:
             # --- agent event dict structure varies by LangGraph version ---
             # Common shapes:
             #   {"agent": {"messages": [AIMessage(...)]}}
@@ -94,6 +104,7 @@ async def map_agent_stream_to_sse(
             if not messages and not has_todo:
                 continue
             if messages is not None:
+                table_items: list[dict[str, Any]] = []
                 for msg in messages:
                     # --- AI Message (model output) ---
                     if isinstance(msg, (AIMessage, AIMessageChunk)):
@@ -125,14 +136,18 @@ async def map_agent_stream_to_sse(
                             "status": status,
                         })
 
-                        # DataTableMiddleware 附加的全量表格数据
+                        # DataTableMiddleware 附加的全量表格数据，本轮结束后合并发送
                         table_data = msg.additional_kwargs.get("table_data")
                         if table_data:
-                            yield _sse("table.data", {
+                            table_items.append({
                                 "execution_id": exec_id,
                                 "tables": table_data,
                             })
 
+                # 并行工具调用的表格合并为一个 table.data 帧，前端只需更新一次状态
+                if table_items:
+                    yield _sse("table.data", {"items": table_items})
+
             # --- Check for state updates in the event values ---
             for key, val in event.items():
                 if not isinstance(val, dict):
@@ -152,9 +167,9 @@ async def map_agent_stream_to_sse(
                 # Suggestions state updates (from SuggestionsMiddleware)
                 if "suggestions" in val and val["suggestions"] is not None:
                     suggestions_data = val["suggestions"]
-                    # Handle both Pydantic model and dict
-                    if hasattr(suggestions_data, "model_dump"):
-                        suggestions_data = suggestions_data.model_dump()
+                    # Handle both SuggestionsData dataclass and dict
+                    if is_dataclass(suggestions_data):
+                        suggestions_data = asdict(suggestions_data)
                     yield _sse("suggestions", {
                         "suggestions": suggestions_data.get("suggestions", []),
                         "multi_select": suggestions_data.get("multi_select", False),
@@ -0,0 +1,190 @@
+"""Tests for DataTableMiddleware CSV helpers.
+
+验证:
+- _parse_csv: 引号内逗号、不等长行、首尾空白
+- _truncate_csv: 与 _parse_csv 同口径计数记录
+- wrap_tool_call / awrap_tool_call: tool_names 放行、小表原样返回、大表截断并保留 id
+- agent.astream(): 异步执行工具时经由 awrap_tool_call 生效
+"""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import MagicMock
+
+from langchain.agents import create_agent
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import tool
+
+from app.agent.middleware.data_table import TABLE_ROWS_FOR_LLM, DataTableMiddleware
+
+_BIG_TABLE = "[DATA_TABLE]\nid\n" + "\n".join(
+    str(i) for i in range(TABLE_ROWS_FOR_LLM + 3)
+) + "\n[/DATA_TABLE]"
+
+
+class _ToolCallingFakeModel(GenericFakeChatModel):
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+class TestParseCsv:
+    def test_quoted_commas_kept_in_cell(self):
+        table = DataTableMiddleware._parse_csv('name,addr\nA,"1, Main St"\n')
+        assert table.headers == ["name", "addr"]
+        assert table.columns == [["A"], ["1, Main St"]]
+        assert table.total_rows == 1
+
+    def test_ragged_rows_aligned_to_headers(self):
+        table = DataTableMiddleware._parse_csv("a,b,c\n1\n2,3,4,5\n")
+        assert table.headers == ["a", "b", "c"]
+        assert table.columns == [["1", "2"], ["", "3"], ["", "4"]]
+        assert table.total_rows == 2
+
+    def test_short_rows_pad_missing_columns(self):
+        table = DataTableMiddleware._parse_csv("a,b,c\n1\n2\n")
+        assert table.columns == [["1", "2"], ["", ""], ["", ""]]
+
+    def test_whitespace_stripped_from_headers_and_cells(self):
+        table = DataTableMiddleware._parse_csv(" x , y \na , b \n")
+        assert table.headers == ["x", "y"]
+        assert table.columns == [["a"], ["b"]]
+
+    def test_blank_lines_skipped(self):
+        table = DataTableMiddleware._parse_csv("h\n\n1\n\n2\n")
+        assert table.columns == [["1", "2"]]
+        assert table.total_rows == 2
+
+    def test_empty_text_returns_none(self):
+        assert DataTableMiddleware._parse_csv("\n\n") is None
+
+
+def _truncate(csv_text: str, max_rows: int) -> str:
+    total = DataTableMiddleware._parse_csv(csv_text).total_rows
+    return DataTableMiddleware._truncate_csv(csv_text, max_rows, total)
+
+
+class TestTruncateCsv:
+    def test_within_limit_returns_original(self):
+        assert _truncate("h\n1\n2\n", 5) == "h\n1\n2\n"
+
+    def test_empty_records_not_counted(self):
+        out = _truncate("h\n1\n,\n2\n3", 2)
+        assert out.splitlines()[:-1] == ["h", "1", ",", "2"]
+        assert out.splitlines()[-1] == "... 共 3 条记录，仅展示前 2 条"
+
+    def test_quoted_newline_counts_as_one_record(self):
+        out = _truncate('h\n"a\nb"\n2\n3\n', 2)
+        assert out.startswith('h\n"a\nb"\n2\n...')
+
+    def test_kept_rows_match_parsed_rows(self):
+        csv_text = "h\n\n1\n ,  \n2\n3\n4\n"
+        out = _truncate(csv_text, 2)
+        kept = DataTableMiddleware._parse_csv(out.rsplit("\n", 1)[0])
+        assert kept.columns == [["1", "2"]]
+
+
+def _request(tool_name: str) -> MagicMock:
+    request = MagicMock()
+    request.tool_call = {"name": tool_name, "args": {}, "id": "call_1"}
+    return request
+
+
+def _tool_message(content: str) -> ToolMessage:
+    return ToolMessage(
+        content=content, tool_call_id="call_1", id="msg-1", artifact={"raw": 1}
+    )
+
+
+class TestWrapToolCall:
+    """同步与异步钩子行为一致."""
+
+    def _call(self, mw, tool_name, result, use_async):
+        request = _request(tool_name)
+        if use_async:
+            async def handler(req):
+                return result
+
+            return asyncio.run(mw.awrap_tool_call(request, handler))
+        return mw.wrap_tool_call(request, lambda req: result)
+
+    def test_non_emitter_tool_passes_through(self):
+        mw = DataTableMiddleware(tool_names={"query_table"})
+        for use_async in (False, True):
+            result = _tool_message(_BIG_TABLE)
+            assert self._call(mw, "other", result, use_async) is result
+
+    def test_small_table_returned_unchanged(self):
+        mw = DataTableMiddleware()
+        small = "[DATA_TABLE]\nid\n1\n2\n[/DATA_TABLE]"
+        for use_async in (False, True):
+            result = _tool_message(small)
+            out = self._call(mw, "query_table", result, use_async)
+            assert out is result
+            assert "table_data" not in out.additional_kwargs
+
+    def test_large_table_truncated_with_table_data(self):
+        mw = DataTableMiddleware(tool_names={"query_table"})
+        for use_async in (False, True):
+            out = self._call(mw, "query_table", _tool_message(_BIG_TABLE), use_async)
+            assert out.id == "msg-1"
+            assert out.artifact == {"raw": 1}
+            assert out.tool_call_id == "call_1"
+            assert f"仅展示前 {TABLE_ROWS_FOR_LLM} 条" in out.content
+            (table,) = out.additional_kwargs["table_data"]
+            assert table["total_rows"] == TABLE_ROWS_FOR_LLM + 3
+            assert table["truncated"] is True
+
+    def test_non_tool_message_result_returned_as_is(self):
+        mw = DataTableMiddleware()
+        for use_async in (False, True):
+            result = object()
+            assert self._call(mw, "query_table", result, use_async) is result
+
+
+class TestAgentAstream:
+    def _run(self, tool_names, tool_name):
+        @tool
+        def query_table() -> str:
+            """返回大表."""
+            return _BIG_TABLE
+
+        @tool
+        def other() -> str:
+            """返回普通文本."""
+            return "plain"
+
+        model = _ToolCallingFakeModel(messages=iter([
+            AIMessage(content="", tool_calls=[{"name": tool_name, "args": {}, "id": "call_1"}]),
+            AIMessage(content="完成"),
+        ]))
+        agent = create_agent(
+            model=model,
+            tools=[query_table, other],
+            middleware=[DataTableMiddleware(tool_names=tool_names)],
+        )
+
+        async def run():
+            tool_messages = []
+            async for event in agent.astream(
+                {"messages": [{"role": "user", "content": "查询"}]},
+                stream_mode="updates",
+            ):
+                for update in event.values():
+                    for msg in (update or {}).get("messages", []):
+                        if isinstance(msg, ToolMessage):
+                            tool_messages.append(msg)
+            return tool_messages
+
+        return asyncio.run(run())
+
+    def test_table_tool_truncated_under_astream(self):
+        (msg,) = self._run({"query_table"}, "query_table")
+        assert msg.tool_call_id == "call_1"
+        assert msg.additional_kwargs["table_data"][0]["total_rows"] == TABLE_ROWS_FOR_LLM + 3
+
+    def test_tool_outside_tool_names_passes_through_under_astream(self):
+        (msg,) = self._run({"query_table"}, "other")
+        assert msg.content == "plain"
+        assert "table_data" not in msg.additional_kwargs
@@ -0,0 +1,99 @@
+"""Tests for app.sse.event_mapper — SSE wire format consumed by the frontend.
+
+验证:
+- table.data 帧形状与 frontend/src/stores/chatStore.ts 的解析一致:
+  {"items": [{"execution_id", "tables": [{"headers", "columns", "total_rows", "truncated"}]}]}
+- 同一轮并行工具调用的表格合并为一个 table.data 帧，且在 tool.result 之后发送
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+from langchain_core.messages import ToolMessage
+
+from app.agent.middleware.data_table import TABLE_ROWS_FOR_LLM, DataTableMiddleware
+from app.sse.event_mapper import map_agent_stream_to_sse
+
+
+def _table_tool_message(tool_call_id: str, n_rows: int) -> ToolMessage:
+    csv_text = "id, name\n" + "\n".join(f"{i}, n{i}" for i in range(n_rows))
+    content = f"[DATA_TABLE]\n{csv_text}\n[/DATA_TABLE]"
+    tables, truncated = DataTableMiddleware()._process_tables(content)
+    return ToolMessage(
+        content=truncated,
+        tool_call_id=tool_call_id,
+        additional_kwargs={"table_data": [t.to_dict() for t in tables]},
+    )
+
+
+def _collect(events: list[dict]) -> list[tuple[str, dict]]:
+    async def stream():
+        for event in events:
+            yield event
+
+    async def run():
+        return [frame async for frame in map_agent_stream_to_sse(stream(), "t1")]
+
+    frames = []
+    for raw in asyncio.run(run()):
+        event_line, data_line = raw.strip().split("\n")
+        frames.append((
+            event_line.removeprefix("event: "),
+            json.loads(data_line.removeprefix("data: ")),
+        ))
+    return frames
+
+
+class TestTableDataFrame:
+    def test_frame_shape_matches_chat_store(self):
+        n_rows = TABLE_ROWS_FOR_LLM + 2
+        frames = _collect([
+            {"tools": {"messages": [_table_tool_message("call_a", n_rows)]}}
+        ])
+
+        assert [name for name, _ in frames] == ["tool.result", "table.data"]
+        assert frames[1][1] == {
+            "items": [
+                {
+                    "execution_id": "call_a",
+                    "tables": [
+                        {
+                            "headers": ["id", "name"],
+                            "columns": [
+                                [str(i) for i in range(n_rows)],
+                                [f"n{i}" for i in range(n_rows)],
+                            ],
+                            "total_rows": n_rows,
+                            "truncated": True,
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def test_parallel_tool_results_coalesced_into_one_frame(self):
+        frames = _collect([
+            {
+                "tools": {
+                    "messages": [
+                        _table_tool_message("call_a", TABLE_ROWS_FOR_LLM + 1),
+                        ToolMessage(content="plain", tool_call_id="call_b"),
+                        _table_tool_message("call_c", TABLE_ROWS_FOR_LLM + 1),
+                    ]
+                }
+            }
+        ])
+
+        assert [name for name, _ in frames] == [
+            "tool.result", "tool.result", "tool.result", "table.data",
+        ]
+        items = frames[-1][1]["items"]
+        assert [item["execution_id"] for item in items] == ["call_a", "call_c"]
+
+    def test_no_table_data_no_frame(self):
+        frames = _collect([
+            {"tools": {"messages": [ToolMessage(content="plain", tool_call_id="call_b")]}}
+        ])
+        assert [name for name, _ in frames] == ["tool.result"]
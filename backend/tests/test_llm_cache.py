@@ -0,0 +1,66 @@
+"""Tests for app.agent.llm_cache — exact-match LLM response cache.
+
+验证:
+- 命中时消息 id 被清空，由 reducer 重新分配
+- 命中时 tool_call id 每次重新生成，不跨会话复用
+- 原始缓存条目不被修改
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+
+from app.agent.llm_cache import ReplaySafeInMemoryCache
+
+
+def _cached_tool_call_generation() -> ChatGeneration:
+    return ChatGeneration(
+        message=AIMessage(
+            content="",
+            id="run-1",
+            tool_calls=[{"name": "search", "args": {"q": "x"}, "id": "call_orig"}],
+            additional_kwargs={"tool_calls": [{"id": "call_orig"}]},
+        )
+    )
+
+
+class TestReplaySafeInMemoryCache:
+    def test_miss_returns_none(self):
+        cache = ReplaySafeInMemoryCache(maxsize=4)
+        assert cache.lookup("p", "llm") is None
+
+    def test_hit_does_not_replay_ids(self):
+        cache = ReplaySafeInMemoryCache(maxsize=4)
+        cache.update("p", "llm", [_cached_tool_call_generation()])
+
+        first = cache.lookup("p", "llm")[0].message
+        second = cache.lookup("p", "llm")[0].message
+
+        assert first.id is None and second.id is None
+        assert first.tool_calls[0]["id"] != "call_orig"
+        assert first.tool_calls[0]["id"] != second.tool_calls[0]["id"]
+        assert first.tool_calls[0]["name"] == "search"
+        assert first.tool_calls[0]["args"] == {"q": "x"}
+        assert "tool_calls" not in first.additional_kwargs
+
+    def test_stored_entry_is_untouched(self):
+        cache = ReplaySafeInMemoryCache(maxsize=4)
+        generation = _cached_tool_call_generation()
+        cache.update("p", "llm", [generation])
+
+        cache.lookup("p", "llm")
+
+        assert generation.message.id == "run-1"
+        assert generation.message.tool_calls[0]["id"] == "call_orig"
+
+    def test_async_lookup_does_not_replay_ids(self):
+        cache = ReplaySafeInMemoryCache(maxsize=4)
+        cache.update("p", "llm", [_cached_tool_call_generation()])
+
+        message = asyncio.run(cache.alookup("p", "llm"))[0].message
+
+        assert message.id is None
+        assert message.tool_calls[0]["id"] != "call_orig"
@@ -9,7 +9,10 @@
 
 from __future__ import annotations
 
-from unittest.mock import MagicMock, patch
+import asyncio
+import json
+import threading
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from langchain_core.messages import AIMessage, HumanMessage
@@ -255,6 +258,156 @@ class TestAfterModel:
         result = mw.after_model({"messages": [AIMessage(content="test")], "todos": []}, mock_runtime)
         assert result is None
 
+    # --- 无消息历史 → 整个 hook 跳过，不评估任何触发条件 ---
+    def test_empty_messages_skips_hook(self):
+        """无消息时应直接返回 None，不调用 trigger_condition."""
+        condition = MagicMock(return_value=True)
+        config = _make_reactive(trigger_condition=condition)
+        mw, mock_runner = self._create_middleware_with_reactive([config])
+
+        result = mw.after_model({"messages": [], "todos": []}, MagicMock())
+
+        assert result is None
+        condition.assert_not_called()
+        mock_runner.invoke_reactive.assert_not_called()
+
+    # --- 同一条消息重复触发 → 跳过 ---
+    def test_same_signature_skipped(self):
+        """最后一条消息与步骤状态均未变化时不应重复调用子 Agent."""
+        config = _make_reactive(trigger_condition=lambda s: True)
+        mw, mock_runner = self._create_middleware_with_reactive([config])
+
+        mock_runtime = MagicMock()
+        state = {"messages": [AIMessage(content="test", id="m1")], "todos": []}
+        assert mw.after_model(state, mock_runtime) is not None
+        assert mw.after_model(state, mock_runtime) is None
+        mock_runner.invoke_reactive.assert_called_once()
+
+        state = {"messages": [AIMessage(content="next", id="m2")], "todos": []}
+        assert mw.after_model(state, mock_runtime) is not None
+        assert mock_runner.invoke_reactive.call_count == 2
+
+    # --- 不同会话出现相同消息 id → 各自触发 ---
+    def test_same_message_id_in_different_threads_fires(self):
+        """签名包含 thread_id：另一会话回放了相同 id 的消息时仍应触发子 Agent."""
+        config = _make_reactive(trigger_condition=lambda s: True)
+        mw, mock_runner = self._create_middleware_with_reactive([config])
+
+        state = {"messages": [AIMessage(content="cached", id="same-id")], "todos": []}
+        for thread_id in ("thread-a", "thread-b"):
+            with patch(
+                "app.agent.subagents.middleware.get_config",
+                return_value={"configurable": {"thread_id": thread_id}},
+            ):
+                assert mw.after_model(state, MagicMock()) is not None
+
+        assert mock_runner.invoke_reactive.call_count == 2
+
+    # --- 异步 hook 走 runner.ainvoke_reactive ---
+    def test_aafter_model_uses_async_runner(self):
+        """aafter_model 应 await runner.ainvoke_reactive 并合并更新."""
+        config = _make_reactive(trigger_condition=lambda s: True)
+        mw, mock_runner = self._create_middleware_with_reactive([config])
+        mock_runner.ainvoke_reactive = AsyncMock(
+            return_value={"todos": [{"content": "s", "status": "completed"}]}
+        )
+
+        state = {"messages": [AIMessage(content="test")], "todos": []}
+        result = asyncio.run(mw.aafter_model(state, MagicMock()))
+
+        assert result == {"todos": [{"content": "s", "status": "completed"}]}
+        mock_runner.ainvoke_reactive.assert_awaited_once()
+        mock_runner.invoke_reactive.assert_not_called()
+
+    def test_aafter_model_coalesces_identical_calls_across_threads(self):
+        """两个会话同时以相同上下文触发时，经真实 runner 只发起一次 LLM 调用."""
+        from app.agent.subagents.middleware import SubAgentMiddleware
+
+        calls = 0
+
+        async def slow_ainvoke(messages, **kwargs):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return AIMessage(content="[]")
+
+        mock_llm = MagicMock()
+        mock_llm.ainvoke = AsyncMock(side_effect=slow_ainvoke)
+        with patch("app.agent.subagents.runner.ChatOpenAI", return_value=mock_llm):
+            mw = SubAgentMiddleware(reactive=[_make_reactive(trigger_condition=lambda s: True)])
+
+        async def run_both():
+            return await asyncio.gather(
+                mw.aafter_model({"messages": [AIMessage(content="a", id="a1")], "todos": []}, MagicMock()),
+                mw.aafter_model({"messages": [AIMessage(content="b", id="b1")], "todos": []}, MagicMock()),
+            )
+
+        results = asyncio.run(run_both())
+
+        assert calls == 1
+        assert results[0] == results[1] == {"todos": [{"content": "done", "status": "completed"}]}
+
+    def _create_two_reactive(self):
+        """辅助: 两个响应式子 Agent，compiled 各自独立."""
+        config_a = _make_reactive(name="tracker_a", trigger_condition=lambda s: True)
+        config_b = _make_reactive(name="tracker_b", trigger_condition=lambda s: True)
+
+        with patch("app.agent.subagents.middleware.SubAgentRunner") as MockRunner:
+            mock_runner = MagicMock()
+            compiled_a = MagicMock(name="compiled_a")
+            compiled_b = MagicMock(name="compiled_b")
+            mock_runner.compile.side_effect = [compiled_a, compiled_b]
+            MockRunner.return_value = mock_runner
+
+            from app.agent.subagents.middleware import SubAgentMiddleware
+            mw = SubAgentMiddleware(reactive=[config_a, config_b])
+        updates = {
+            id(compiled_a): {"todos": [{"content": "from A", "status": "completed"}]},
+            id(compiled_b): {"metrics": [{"name": "RSRP", "value": -100}]},
+        }
+        return mw, mock_runner, updates
+
+    def test_multiple_reactive_dispatched_concurrently(self):
+        """多个响应式子 Agent 应并发调用（同步路径走线程池）."""
+        mw, mock_runner, updates = self._create_two_reactive()
+        barrier = threading.Barrier(2, timeout=5)
+
+        def invoke(compiled, state):
+            barrier.wait()  # 两个调用必须同时在途，否则超时
+            return updates[id(compiled)]
+
+        mock_runner.invoke_reactive.side_effect = invoke
+
+        state = {"messages": [AIMessage(content="test")], "todos": []}
+        result = mw.after_model(state, MagicMock())
+
+        assert result == {
+            "todos": [{"content": "from A", "status": "completed"}],
+            "metrics": [{"name": "RSRP", "value": -100}],
+        }
+
+    def test_aafter_model_gathers_reactive(self):
+        """aafter_model 应通过 asyncio.gather 并发 await 各子 Agent."""
+        mw, mock_runner, updates = self._create_two_reactive()
+        in_flight = 0
+        peak = 0
+
+        async def ainvoke(compiled, state):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return updates[id(compiled)]
+
+        mock_runner.ainvoke_reactive = AsyncMock(side_effect=ainvoke)
+
+        state = {"messages": [AIMessage(content="test")], "todos": []}
+        result = asyncio.run(mw.aafter_model(state, MagicMock()))
+
+        assert peak == 2
+        assert set(result) == {"todos", "metrics"}
+
 
 # ===========================================================================
 # task() Tool 测试
@@ -302,3 +455,85 @@ class TestTaskTool:
 
         assert "未知" in result
         assert "delegated_test" in result  # 提示可用名称
+
+    # --- batch_task: 默认不提供 ---
+    @patch("app.agent.subagents.middleware.SubAgentRunner")
+    def test_batch_task_disabled_by_default(self, MockRunner):
+        """未设置 max_batch_concurrency 时只有 task tool."""
+        MockRunner.return_value.compile.return_value = MagicMock(description="分析师")
+
+        from app.agent.subagents.middleware import SubAgentMiddleware
+        mw = SubAgentMiddleware(delegated=[_make_delegated()])
+
+        assert [t.name for t in mw.tools] == ["task"]
+
+    # --- batch_task: description 列出可用子 Agent ---
+    @patch("app.agent.subagents.middleware.SubAgentRunner")
+    def test_batch_task_description_lists_agents(self, MockRunner):
+        """batch_task 的 description 应包含可用子 Agent 名称."""
+        MockRunner.return_value.compile.return_value = MagicMock(description="分析师")
+
+        from app.agent.subagents.middleware import SubAgentMiddleware
+        mw = SubAgentMiddleware(delegated=[_make_delegated()], max_batch_concurrency=4)
+
+        assert "delegated_test" in mw.tools[1].description
+
+    # --- batch_task: 并发委派，结果按提交顺序返回 ---
+    @patch("app.agent.subagents.middleware.SubAgentRunner")
+    def test_batch_task_runs_concurrently(self, MockRunner):
+        """batch_task 应并发调用子 Agent，并按提交顺序返回 JSON 结果."""
+        mock_runner = MagicMock()
+        mock_runner.compile.return_value = MagicMock(description="分析师")
+        barrier = threading.Barrier(2, timeout=5)
+
+        def invoke(compiled, description):
+            barrier.wait()  # 两个任务必须同时在途，否则超时
+            return f"完成: {description}"
+
+        mock_runner.invoke_delegated.side_effect = invoke
+        MockRunner.return_value = mock_runner
+
+        from app.agent.subagents.middleware import SubAgentMiddleware
+        mw = SubAgentMiddleware(delegated=[_make_delegated()], max_batch_concurrency=4)
+
+        batch_tool = mw.tools[1]
+        result = batch_tool.invoke({"invocations": [
+            {"agent_name": "delegated_test", "task_description": "A"},
+            {"agent_name": "delegated_test", "task_description": "B"},
+            {"agent_name": "不存在的agent", "task_description": "C"},
+        ]})
+
+        data = json.loads(result)
+        assert [d["result"] for d in data[:2]] == ["完成: A", "完成: B"]
+        assert "未知" in data[2]["result"]
+
+    # --- batch_task 异步: 受 Semaphore 限制 ---
+    @patch("app.agent.subagents.middleware.SubAgentRunner")
+    def test_batch_task_async_respects_concurrency_limit(self, MockRunner):
+        """异步 batch_task 同时在途的子 Agent 数不应超过 max_batch_concurrency."""
+        mock_runner = MagicMock()
+        mock_runner.compile.return_value = MagicMock(description="分析师")
+        in_flight = 0
+        peak = 0
+
+        async def ainvoke(compiled, description):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return description
+
+        mock_runner.ainvoke_delegated = AsyncMock(side_effect=ainvoke)
+        MockRunner.return_value = mock_runner
+
+        from app.agent.subagents.middleware import SubAgentMiddleware
+        mw = SubAgentMiddleware(delegated=[_make_delegated()], max_batch_concurrency=2)
+
+        batch_tool = mw.tools[1]
+        result = asyncio.run(batch_tool.ainvoke({"invocations": [
+            {"agent_name": "delegated_test", "task_description": str(i)} for i in range(5)
+        ]}))
+
+        assert peak == 2
+        assert [d["result"] for d in json.loads(result)] == ["0", "1", "2", "3", "4"]
@@ -0,0 +1,166 @@
+"""Tests for app.agent.middleware.missing_params — pattern 校验.
+
+验证:
+- ParamSchema.matches: 平凡 pattern、.+、长度 pattern、前缀 pattern、完整正则（搜索语义）
+- 快捷判定不进入正则引擎，且结果与 re.search 一致
+- check_all 推断: Pydantic 模型按类缓存，JSON Schema dict 不走缓存也不报错
+- before_tool: 只对空的必填参数触发表单，不按 pattern 拦截已填写的值
+"""
+
+from __future__ import annotations
+
+import re
+from unittest.mock import patch
+
+import pytest
+
+from langchain_core.tools import StructuredTool
+from pydantic import BaseModel
+
+from app.agent.middleware.missing_params import (
+    MissingParamsMiddleware,
+    ParamSchema,
+    _compile_pattern,
+)
+
+_SAMPLE_VALUES = (
+    "", "a", "ab", "abc", "abcd", "abcde", "\n", "a\n", "ab\n", "ab\n\n",
+    "a\nb", "\nab", "CUST-1", "CUST_1", "cust_1",
+)
+
+
+class TestParamSchemaMatches:
+    def test_no_pattern_always_matches(self):
+        assert ParamSchema().matches("anything")
+
+    def test_trivial_patterns_always_match(self):
+        for pattern in ("", ".*", "^.*"):
+            assert ParamSchema(pattern=pattern).matches("")
+            assert ParamSchema(pattern=pattern).matches("x\ny")
+
+    def test_literal_prefix_pattern(self):
+        schema = ParamSchema(pattern="^CUST-")
+        assert schema.matches("CUST-001")
+        assert not schema.matches("cust-001")
+        assert not schema.matches("X-CUST-001")
+
+    def test_non_empty_pattern(self):
+        schema = ParamSchema(pattern=".+")
+        assert schema.matches("a")
+        assert not schema.matches("")
+        assert not schema.matches("\n")
+
+    def test_length_patterns(self):
+        assert ParamSchema(pattern="^.{2,4}$").matches("abc")
+        assert not ParamSchema(pattern="^.{2,4}$").matches("abcde")
+        assert not ParamSchema(pattern="^.{2,4}$").matches("a\nb")
+        assert ParamSchema(pattern="^.{3}$").matches("abc")
+        assert not ParamSchema(pattern="^.{3}$").matches("ab")
+        assert ParamSchema(pattern="^.{2,}$").matches("abcdef")
+        assert not ParamSchema(pattern="^.{2,}$").matches("a")
+
+    def test_full_regex_uses_search_semantics(self):
+        schema = ParamSchema(pattern=r"\d{3}")
+        assert schema.matches("abc123")
+        assert not schema.matches("ab12")
+
+    def test_anchored_regex(self):
+        schema = ParamSchema(pattern=r"^\d+$")
+        assert schema.matches("42")
+        assert not schema.matches("42a")
+
+
+class TestCompilePatternShortcuts:
+    @pytest.mark.parametrize(
+        "pattern",
+        [".+", "^.{1,3}$", "^.{4}$", "^.{2,}$", "^.{0,1}$", "^CUST_"],
+    )
+    def test_shortcut_skips_regex_engine_and_agrees_with_search(self, pattern):
+        _compile_pattern.cache_clear()
+        with patch("app.agent.middleware.missing_params.re.compile") as mock_compile:
+            check = _compile_pattern(pattern)
+        mock_compile.assert_not_called()
+        for value in _SAMPLE_VALUES:
+            assert check(value) == (re.search(pattern, value) is not None), value
+
+    def test_prefix_with_metachars_uses_regex(self):
+        check = _compile_pattern("^CUST-1?")
+        for value in _SAMPLE_VALUES:
+            assert check(value) == (re.search("^CUST-1?", value) is not None), value
+
+
+class _OrderArgs(BaseModel):
+    customer_id: str
+
+
+def _noop(**kwargs) -> str:
+    return "ok"
+
+
+class TestCheckAllInference:
+    def _middleware(self, args_schema) -> MissingParamsMiddleware:
+        mw = MissingParamsMiddleware(check_all_tools=True)
+        mw.bind_tools([
+            StructuredTool.from_function(
+                func=_noop, name="order", description="d", args_schema=args_schema
+            )
+        ])
+        return mw
+
+    def test_pydantic_schema_inferred_and_shared(self):
+        first = self._middleware(_OrderArgs)._get_params_schema("order", {})
+        second = self._middleware(_OrderArgs)._get_params_schema("order", {})
+        assert list(first) == ["customer_id"]
+        assert first is second
+
+    def test_json_schema_dict_does_not_raise(self):
+        args_schema = {
+            "type": "object",
+            "properties": {"customer_id": {"type": "string"}},
+            "required": ["customer_id"],
+        }
+        with patch("app.agent.middleware.missing_params.interrupt") as mock_interrupt:
+            result = self._middleware(args_schema).before_tool(
+                {}, {"name": "order", "id": "call_1", "args": {}}
+            )
+        assert result is None
+        mock_interrupt.assert_not_called()
+
+
+class TestBeforeToolPattern:
+    def _middleware(self) -> MissingParamsMiddleware:
+        return MissingParamsMiddleware(
+            tools_with_param_edit={
+                "create_order": {
+                    "customer_id": ParamSchema(pattern="^CUST-"),
+                    "note": ParamSchema(type=["string", "null"], pattern=r"^\w+$"),
+                }
+            }
+        )
+
+    def _tool_call(self, **args) -> dict:
+        return {"name": "create_order", "id": "call_1", "args": args}
+
+    def test_matching_values_pass_through(self):
+        with patch("app.agent.middleware.missing_params.interrupt") as mock_interrupt:
+            result = self._middleware().before_tool(
+                {}, self._tool_call(customer_id="CUST-1", note="ok")
+            )
+        assert result is None
+        mock_interrupt.assert_not_called()
+
+    def test_empty_optional_value_not_validated(self):
+        with patch("app.agent.middleware.missing_params.interrupt") as mock_interrupt:
+            result = self._middleware().before_tool(
+                {}, self._tool_call(customer_id="CUST-1", note="")
+            )
+        assert result is None
+        mock_interrupt.assert_not_called()
+
+    def test_mismatched_value_not_reported_as_missing(self):
+        with patch("app.agent.middleware.missing_params.interrupt") as mock_interrupt:
+            result = self._middleware().before_tool(
+                {}, self._tool_call(customer_id="9", note="ok")
+            )
+        assert result is None
+        mock_interrupt.assert_not_called()
@@ -9,7 +9,8 @@
 
 from __future__ import annotations
 
-from unittest.mock import MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from langchain_core.messages import AIMessage, HumanMessage
@@ -292,6 +293,87 @@ class TestInvokeReactive:
         result = runner.invoke_reactive(compiled, {"messages": []})
         assert result == {"todos": []}
 
+    # --- 相同上下文命中输出缓存 ---
+    def test_simple_mode_response_cache(self):
+        """相同上下文重复触发时只调用一次 LLM，上下文变化后重新调用."""
+        mock_llm = MagicMock()
+        mock_response = MagicMock()
+        mock_response.content = "[]"
+        mock_llm.invoke.return_value = mock_response
+
+        runner = SubAgentRunner()
+        contexts = iter(["上下文A", "上下文A", "上下文B"])
+        config = _make_reactive_config(
+            context_builder=lambda state: [HumanMessage(content=next(contexts))]
+        )
+        compiled = CompiledSubAgent(
+            name="test_reactive",
+            description="test",
+            config=config,
+            llm=mock_llm,
+        )
+
+        for _ in range(3):
+            runner.invoke_reactive(compiled, {"messages": []})
+
+        assert mock_llm.invoke.call_count == 2
+
+    # --- 异步调用走 llm.ainvoke ---
+    def test_simple_mode_ainvoke(self):
+        """ainvoke_reactive: Simple 模式应调用 llm.ainvoke，不调用同步 invoke."""
+        mock_llm = MagicMock()
+        mock_response = MagicMock()
+        mock_response.content = "[]"
+        mock_llm.ainvoke = AsyncMock(return_value=mock_response)
+
+        runner = SubAgentRunner()
+        compiled = CompiledSubAgent(
+            name="test_reactive",
+            description="test",
+            config=_make_reactive_config(),
+            llm=mock_llm,
+        )
+
+        result = asyncio.run(runner.ainvoke_reactive(compiled, {"messages": []}))
+
+        assert result == {"todos": [{"content": "步骤1", "status": "completed"}]}
+        mock_llm.ainvoke.assert_awaited_once()
+        mock_llm.invoke.assert_not_called()
+
+    # --- 并发的相同调用合并为一次 ---
+    def test_concurrent_identical_ainvoke_coalesced(self):
+        """并发提交相同上下文时只应发起一次 llm.ainvoke."""
+        calls = 0
+
+        async def slow_ainvoke(messages, **kwargs):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            response = MagicMock()
+            response.content = "[]"
+            return response
+
+        mock_llm = MagicMock()
+        mock_llm.ainvoke = slow_ainvoke
+
+        runner = SubAgentRunner()
+        compiled = CompiledSubAgent(
+            name="test_reactive",
+            description="test",
+            config=_make_reactive_config(),
+            llm=mock_llm,
+        )
+
+        async def run_concurrently():
+            return await asyncio.gather(
+                *(runner.ainvoke_reactive(compiled, {"messages": []}) for _ in range(3))
+            )
+
+        results = asyncio.run(run_concurrently())
+
+        assert calls == 1
+        assert all(r == {"todos": [{"content": "步骤1", "status": "completed"}]} for r in results)
+
 
 # ===========================================================================
 # invoke_delegated() 测试
@@ -329,6 +411,27 @@ class TestInvokeDelegated:
         assert len(call_args["messages"]) == 1
         assert isinstance(call_args["messages"][0], HumanMessage)
 
+    def test_successful_delegation_async(self):
+        """ainvoke_delegated 应 await runnable.ainvoke 并返回 AIMessage 内容."""
+        mock_runnable = MagicMock()
+        mock_runnable.ainvoke = AsyncMock(return_value={
+            "messages": [HumanMessage(content="任务"), AIMessage(content="异步分析完成")]
+        })
+
+        runner = SubAgentRunner()
+        compiled = CompiledSubAgent(
+            name="analyst",
+            description="分析子 Agent",
+            config=_make_delegated_config(),
+            runnable=mock_runnable,
+        )
+
+        result = asyncio.run(runner.ainvoke_delegated(compiled, "请分析"))
+
+        assert result == "异步分析完成"
+        mock_runnable.ainvoke.assert_awaited_once()
+        mock_runnable.invoke.assert_not_called()
+
     # --- Example 14: Simple 模式不能委派 ---
     def test_simple_mode_cannot_delegate(self):
         """Simple 模式的 compiled (无 runnable) 应返回错误提示."""
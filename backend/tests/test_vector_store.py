@@ -0,0 +1,109 @@
+"""Tests for app.knowledge.vector_store — persisted FAISS index reuse.
+
+验证:
+- 源文档清单一致时直接加载持久化索引
+- 源文档变化时重建索引
+- 源目录缺失时仍加载持久化索引
+- 检索结果 LRU：命中、淘汰、重建后清空
+"""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.knowledge.vector_store import KnowledgeManager
+
+
+@pytest.fixture
+def kb_settings(tmp_path):
+    docs = tmp_path / "terms"
+    docs.mkdir()
+    (docs / "a.md").write_text("# Alpha\n\nalpha term definition\n", encoding="utf-8")
+
+    settings = MagicMock()
+    settings.faiss_index_dir = str(tmp_path / "index")
+    settings.terminology_dir = str(docs)
+    settings.design_docs_dir = str(tmp_path / "no_design_docs")
+    with patch("app.knowledge.vector_store.settings", settings):
+        yield settings
+
+
+def _initialized_manager() -> KnowledgeManager:
+    manager = KnowledgeManager()
+    manager.initialize()
+    return manager
+
+
+class TestLoadOrBuild:
+    def test_matching_manifest_loads_persisted_index(self, kb_settings):
+        _initialized_manager()
+
+        with patch("app.knowledge.vector_store.FAISS.from_documents") as build:
+            manager = _initialized_manager()
+
+        build.assert_not_called()
+        assert manager.terminology_store is not None
+
+    def test_changed_source_rebuilds_index(self, kb_settings, tmp_path):
+        _initialized_manager()
+        (tmp_path / "terms" / "b.md").write_text("# Beta\n\nbeta\n", encoding="utf-8")
+
+        manager = _initialized_manager()
+
+        assert manager.terminology_store.index.ntotal == 2
+
+    def test_missing_source_dir_loads_persisted_index(self, kb_settings, tmp_path):
+        _initialized_manager()
+        kb_settings.terminology_dir = str(tmp_path / "moved_away")
+
+        manager = _initialized_manager()
+
+        assert manager.terminology_store is not None
+        assert manager.terminology_store.index.ntotal == 1
+
+
+class TestSearchCache:
+    def test_hit_skips_search_and_uses_stripped_query(self, kb_settings):
+        manager = _initialized_manager()
+        store = manager.terminology_store
+
+        with patch.object(store, "similarity_search", wraps=store.similarity_search) as search:
+            first = manager.search_terminology("  alpha ")
+            second = manager.search_terminology("alpha")
+
+        search.assert_called_once_with("alpha", k=3)
+        assert first == second
+        assert first is not second
+
+    def test_least_recent_entry_evicted(self, kb_settings):
+        manager = _initialized_manager()
+        store = manager.terminology_store
+
+        with (
+            patch("app.knowledge.vector_store.SEARCH_CACHE_SIZE", 2),
+            patch.object(store, "similarity_search", wraps=store.similarity_search) as search,
+        ):
+            manager.search_terminology("a")
+            manager.search_terminology("b")
+            manager.search_terminology("a")
+            manager.search_terminology("c")
+            manager.search_terminology("a")
+            manager.search_terminology("b")
+
+        assert [c.args[0] for c in search.call_args_list] == ["a", "b", "c", "b"]
+
+    def test_rebuild_clears_cache(self, kb_settings):
+        manager = _initialized_manager()
+        manager.search_terminology("alpha")
+
+        manager.rebuild("terminology")
+
+        with patch.object(
+            manager.terminology_store,
+            "similarity_search",
+            wraps=manager.terminology_store.similarity_search,
+        ) as search:
+            manager.search_terminology("alpha")
+        search.assert_called_once()
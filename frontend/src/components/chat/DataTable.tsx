@@ -8,19 +8,28 @@ interface Props {
 
 const ROWS_PER_PAGE = 10;
 
+/** Assemble row i from the column-major table. */
+function rowAt(table: TableData, i: number): string[] {
+  return table.columns.map((col) => col[i] ?? "");
+}
+
 export default function DataTable({ table, tableIndex = 0 }: Props) {
   const [currentPage, setCurrentPage] = useState(0);
 
-  const totalPages = Math.ceil(table.rows.length / ROWS_PER_PAGE);
+  const rowCount = table.columns[0]?.length ?? 0;
+  const totalPages = Math.ceil(rowCount / ROWS_PER_PAGE);
   const startIdx = currentPage * ROWS_PER_PAGE;
-  const endIdx = Math.min(startIdx + ROWS_PER_PAGE, table.rows.length);
-  const visibleRows = table.rows.slice(startIdx, endIdx);
+  const endIdx = Math.min(startIdx + ROWS_PER_PAGE, rowCount);
+  const visibleRows: string[][] = [];
+  for (let i = startIdx; i < endIdx; i++) {
+    visibleRows.push(rowAt(table, i));
+  }
 
   const handleExportCSV = () => {
-    const lines = [
-      table.headers.join(","),
-      ...table.rows.map((row) => row.join(",")),
-    ];
+    const lines = [table.headers.join(",")];
+    for (let i = 0; i < rowCount; i++) {
+      lines.push(rowAt(table, i).join(","));
+    }
     const blob = new Blob([lines.join("\n")], {
       type: "text/csv;charset=utf-8;",
     });
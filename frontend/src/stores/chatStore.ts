@@ -201,11 +201,13 @@ export const useChatStore = create<ChatState>((set, get) => ({
 
         case "table.data": {
           if (last && last.role === "assistant") {
-            const execId = data.execution_id as string;
-            const tables = data.tables as TableData[];
-            last.toolCalls = (last.toolCalls ?? []).map((tc) =>
-              tc.execution_id === execId ? { ...tc, tableData: tables } : tc
-            );
+            // One frame carries the tables of every tool result in the update
+            const items = data.items as { execution_id: string; tables: TableData[] }[];
+            const tablesByExec = new Map(items.map((it) => [it.execution_id, it.tables]));
+            last.toolCalls = (last.toolCalls ?? []).map((tc) => {
+              const tables = tablesByExec.get(tc.execution_id);
+              return tables ? { ...tc, tableData: tables } : tc;
+            });
             msgs[lastIdx] = last;
           }
           return { messages: msgs };
@@ -35,7 +35,8 @@ export interface Message {
 /** 从后端 DataTableMiddleware 提取的结构化表格数据 */
 export interface TableData {
   headers: string[];
-  rows: string[][];
+  /** Column-major cells: columns[i] holds every value of headers[i]. */
+  columns: string[][];
   total_rows: number;
   truncated: boolean;
 }